@@ -1,26 +1,45 @@
 # app.py
+import uuid
 from pathlib import Path
 
 import streamlit as st
 
-from chatbot.bot_logic import SimpleRetrievalBot
+from chatbot.bot_logic import ResponseRotator, SimpleRetrievalBot
+from chatbot.history import ConversationHistory
+from chatbot.metrics import timer
 from chatbot.sentiment import (
+    RunningSummary,
     get_sentiment_label_and_score,
-    analyze_trend,
-    summarize_conversation,
 )
+from chatbot.storage import DEFAULT_DB_PATH, open_store
 
 INTENTS_PATH = Path("intents.json")
 QUIT_COMMANDS = ("/quit", "quit", "exit")
 
 
-def init_state():
-    if "bot" not in st.session_state:
-        st.session_state.bot = SimpleRetrievalBot(INTENTS_PATH, min_confidence=0.3)
+@st.cache_resource
+def get_bot():
+    """
+    One bot per process, shared by every browser session. Replies only read
+    the current index snapshot and reloads swap it atomically. The intents
+    file is stat'ed at most once a second and the reload lock is only taken
+    when it changed, so concurrent sessions do not serialize on it.
+    """
+    return SimpleRetrievalBot(INTENTS_PATH, min_confidence=0.3, auto_reload=True, cache_ttl=3600)
+
 
+def init_state():
     if "history" not in st.session_state:
-        # list of {"User_text", "Bot_reply", "label", "score"}
-        st.session_state.history = []
+        # turns as {"User_text", "Bot_reply", "label", "score", "tag"}, stored column-wise
+        st.session_state.history = ConversationHistory()
+
+    if "summary" not in st.session_state:
+        # running overall label / trend, updated as each turn is appended
+        st.session_state.summary = RunningSummary()
+
+    if "rotator" not in st.session_state:
+        # avoids repeating the same reply for a tag within this chat
+        st.session_state.rotator = ResponseRotator()
 
     if "finished" not in st.session_state:
         st.session_state.finished = False
@@ -31,43 +50,29 @@ def init_state():
     if "trend" not in st.session_state:
         st.session_state.trend = None
 
-    if "chats" not in st.session_state:
-        st.session_state.chats = []
+    if "session_id" not in st.session_state:
+        # completed chats are stored in SQLite under this id
+        st.session_state.session_id = uuid.uuid4().hex
 
 
 def end_conversation():
     """Compute summary, mood trend, store in session, and mark finished."""
     history = st.session_state.history
+    summary = st.session_state.summary
 
     if not history:
         overall = "Neutral"
         trend = "No messages to analyze."
-        export_text = "No chat available."
     else:
-        overall = summarize_conversation(history)
-        scores = [h["score"] for h in history]
-        trend = analyze_trend(scores)
-        export_text = "\n".join(
-            [
-                f"User: {h['User_text']}\n"
-                f"Sentiment: {h['label']}\n"
-                f"Bot: {h['Bot_reply']}\n"
-                for h in history
-            ]
-        )
-
-    # make sure chats list exists
-    if "chats" not in st.session_state:
-        st.session_state.chats = []
-
-    # store this chat in memory only
-    st.session_state.chats.append(
-        {
-            "history": history.copy(),
-            "overall": overall,
-            "trend": trend,
-            "export_text": export_text,
-        }
+        overall = summary.overall_label()
+        trend = summary.trend()
+
+    # store this chat (and all its turns) in one transaction
+    open_store(DEFAULT_DB_PATH).save_conversation(
+        history,
+        overall=overall,
+        trend=trend,
+        session_id=st.session_state.session_id,
     )
 
     # Build final one-line conclusion
@@ -89,7 +94,9 @@ def main():
     st.set_page_config(page_title="Sentiment Chatbot", page_icon="💬")
     init_state()
 
-    bot = st.session_state.bot
+    bot = get_bot()
+    # lets the Diagnostics page read the shared bot's cache counters
+    st.session_state.bot = bot
     history = st.session_state.history
     finished = st.session_state.finished
 
@@ -144,7 +151,7 @@ def main():
                 end_conversation()
             else:
                 sentiment_label, compound = get_sentiment_label_and_score(text)
-                bot_reply = bot.reply(text)
+                bot_reply, tag, _ = bot.answer(text, st.session_state.rotator)
 
                 history.append(
                     {
@@ -152,9 +159,11 @@ def main():
                         "Bot_reply": bot_reply,
                         "label": sentiment_label,
                         "score": compound,
+                        "tag": tag,
                     }
                 )
                 st.session_state.history = history
+                st.session_state.summary.add(compound)
 
             st.rerun()
 
@@ -180,8 +189,10 @@ def main():
 
         with col3:
             if st.button("🔄 Start New Conversation"):
-                # reset everything except bot instance
-                st.session_state.history = []
+                # reset the conversation state
+                st.session_state.history = ConversationHistory()
+                st.session_state.summary = RunningSummary()
+                st.session_state.rotator = ResponseRotator()
                 st.session_state.finished = False
                 st.session_state.overall_label = None
                 st.session_state.trend = None
@@ -195,4 +206,6 @@ def main():
         st.caption("Type your message below and press Enter to chat with the bot.")
 
 if __name__ == "__main__":
-    main()
+    # st.rerun() ends a run by raising, which the timer still records
+    with timer("app.rerun"):
+        main()
@@ -0,0 +1,111 @@
+"""
+TF-IDF vs. dense (character n-gram LSA) retrieval on held-out paraphrases.
+
+Every fourth pattern of each intent is held out of the catalog the bots are
+built from; the held-out patterns, plus abbreviated ("you" -> "u") and
+misspelled variants of them, are the queries. Accuracy is the share of
+queries whose best intent is the true one; "fallback" is the share of
+off-topic messages that stay below min_confidence.
+
+Run from the project root:
+
+    python -m benchmarks.bench_backends [min_confidence]
+"""
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from chatbot.bot_logic import BACKENDS, SimpleRetrievalBot
+
+INTENTS_PATH = Path("intents.json")
+HOLD_OUT_EVERY = 4
+ABBREVIATIONS = {
+    "you": "u", "are": "r", "your": "ur", "doing": "doin", "thanks": "thx",
+    "please": "pls", "what": "wat", "going": "goin", "because": "cuz", "okay": "ok",
+}
+OFF_TOPIC = [
+    "sdlfkjsdlfkjweoiruwoeiur", "qwerty uiop", "the mitochondria is the powerhouse",
+    "purple elephants dance quietly", "zxcv bnm", "carburetor torque specification",
+    "lorem ipsum dolor sit amet", "photosynthesis in cacti", "xkcd 927", "asdf jkl",
+]
+
+
+def _split(data):
+    train, held_out = [], []
+    for intent in data["intents"]:
+        patterns = intent["patterns"]
+        keep = [p for i, p in enumerate(patterns) if len(patterns) < 3 or i % HOLD_OUT_EVERY != 1]
+        held_out += [(p, intent["tag"]) for p in patterns if p not in keep]
+        train.append(dict(intent, patterns=keep))
+    return {"intents": train}, held_out
+
+
+def _typo(word, rng):
+    if len(word) < 4:
+        return word
+    i = rng.randrange(1, len(word) - 1)
+    if rng.random() < 0.5:
+        return word[:i] + word[i + 1:]                       # dropped letter
+    return word[:i - 1] + word[i] + word[i - 1] + word[i + 1:]  # swapped letters
+
+
+def paraphrases(held_out, seed=0):
+    rng = random.Random(seed)
+    queries = []
+    for text, tag in held_out:
+        words = text.lower().split()
+        queries.append((text, tag))
+        queries.append((" ".join(ABBREVIATIONS.get(w, w) for w in words), tag))
+        queries.append((" ".join(_typo(w, rng) for w in words), tag))
+    return queries
+
+
+def _evaluate(bot, queries):
+    texts = [q for q, _ in queries]
+    predicted = [tag for tag, _ in bot.classify_batch(texts)]
+    accuracy = sum(p == tag for p, (_, tag) in zip(predicted, queries)) / len(queries)
+    off_topic = bot.classify_batch(OFF_TOPIC)
+    fallback = sum(score < bot.min_confidence for _, score in off_topic) / len(OFF_TOPIC)
+
+    timings = []
+    for text in texts:
+        start = time.perf_counter()
+        bot.classify_batch([text])
+        timings.append((time.perf_counter() - start) * 1000)
+    start = time.perf_counter()
+    bot.classify_batch(texts)
+    batch_rate = len(texts) / (time.perf_counter() - start)
+    return accuracy, fallback, statistics.median(timings), batch_rate
+
+
+def main():
+    min_confidence = float(sys.argv[1]) if len(sys.argv) > 1 else 0.3
+    with open(INTENTS_PATH, "r") as f:
+        train, held_out = _split(json.load(f))
+    queries = paraphrases(held_out)
+
+    print(f"{len(held_out)} held-out patterns, {len(queries)} queries, "
+          f"min_confidence={min_confidence}")
+    print(f"{'backend':<10}{'build ms':>10}{'accuracy':>10}{'fallback':>10}"
+          f"{'p50 ms':>10}{'batch msg/s':>14}")
+    with tempfile.TemporaryDirectory() as tmp:
+        intents_path = Path(tmp) / "intents.json"
+        intents_path.write_text(json.dumps(train))
+        for backend in BACKENDS:
+            # the first build also pays for importing sklearn; time the second
+            for _ in range(2):
+                start = time.perf_counter()
+                bot = SimpleRetrievalBot(intents_path, min_confidence=min_confidence,
+                                         use_index_cache=False, cache_size=0, backend=backend)
+                build_ms = (time.perf_counter() - start) * 1000
+            accuracy, fallback, p50, rate = _evaluate(bot, queries)
+            print(f"{backend:<10}{build_ms:>10.1f}{accuracy:>10.1%}{fallback:>10.1%}"
+                  f"{p50:>10.3f}{rate:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
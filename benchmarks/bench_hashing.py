@@ -0,0 +1,89 @@
+"""
+Vocabulary TF-IDF vs. hashed TF-IDF: match agreement, memory, latency and
+the cost of adding patterns.
+
+Memory is the Python heap (tracemalloc, which also sees NumPy buffers) still
+held by the index after it is built. "add 1%" times index.updated() with 1%
+new patterns that bring new words, which forces the vocabulary backend to
+refit and lets the hashed one hash just the new patterns.
+
+Run from the project root:
+
+    python -m benchmarks.bench_hashing [n_patterns ...]
+"""
+import copy
+import gc
+import statistics
+import sys
+import time
+import tracemalloc
+
+from benchmarks.synthetic import synthetic_intents, synthetic_queries
+from chatbot.bot_logic import HashedIntentIndex, IntentIndex
+
+N_QUERIES = 2000
+MIN_CONFIDENCE = 0.3
+
+
+def _build(index_cls, data):
+    gc.collect()
+    tracemalloc.start()
+    base, _ = tracemalloc.get_traced_memory()
+    start = time.perf_counter()
+    index = index_cls.build(data)
+    build_s = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return index, build_s, (current - base) / 2**20
+
+
+def _best(index, queries):
+    idx, scores = index.best_candidates(queries)
+    return [(index.pattern_to_tag[i], s >= MIN_CONFIDENCE) for i, s in zip(idx, scores)]
+
+
+def _p50_ms(index, queries):
+    timings = []
+    for q in queries[:500]:
+        start = time.perf_counter()
+        index.best_candidates([q])
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def _with_new_patterns(data, fraction=0.01):
+    data = copy.deepcopy(data)
+    n_new = max(1, int(sum(len(i["patterns"]) for i in data["intents"]) * fraction))
+    for i in range(n_new):
+        data["intents"][i % len(data["intents"])]["patterns"].append(f"novel{i} w1 w2")
+    return data
+
+
+def main():
+    sizes = [int(a) for a in sys.argv[1:]] or [10_000, 100_000]
+    queries = synthetic_queries(N_QUERIES)
+    IntentIndex.build(synthetic_intents(100))  # warm imports
+
+    print(f"{'patterns':>9} {'backend':<8}{'build s':>9}{'heap MiB':>10}{'p50 ms':>9}"
+          f"{'add 1% s':>10}{'agreement':>11}")
+    for n_patterns in sizes:
+        data = synthetic_intents(n_patterns)
+        grown = _with_new_patterns(data)
+        reference = None
+        for name, index_cls in (("tfidf", IntentIndex), ("hashed", HashedIntentIndex)):
+            index, build_s, heap_mib = _build(index_cls, data)
+            matches = _best(index, queries)
+            reference = reference or matches
+            agreement = sum(a == b for a, b in zip(matches, reference)) / len(queries)
+
+            start = time.perf_counter()
+            index.updated(grown)
+            add_s = time.perf_counter() - start
+
+            print(f"{n_patterns:>9} {name:<8}{build_s:>9.2f}{heap_mib:>10.1f}"
+                  f"{_p50_ms(index, queries):>9.3f}{add_s:>10.2f}{agreement:>11.2%}")
+            del index
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Memory per turn of a long conversation: list of dicts vs. ConversationHistory.
+
+Run from the project root:
+
+    python -m benchmarks.bench_history [n_turns]
+"""
+import sys
+import time
+import tracemalloc
+
+from benchmarks.synthetic import synthetic_history
+from chatbot.history import ConversationHistory
+
+
+def _traced(build):
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current
+
+
+def main():
+    n_turns = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    turns, dict_bytes = _traced(lambda: synthetic_history(n_turns))
+    history, columnar_bytes = _traced(lambda: ConversationHistory(turns))
+    assert history[n_turns // 2] == turns[n_turns // 2]
+
+    # timings untraced
+    start = time.perf_counter()
+    ConversationHistory(turns)
+    append_s = time.perf_counter() - start
+    history.to_frame()  # imports pandas
+    start = time.perf_counter()
+    frame = history.to_frame()
+    frame_ms = (time.perf_counter() - start) * 1000
+
+    print(f"{n_turns} turns")
+    print(f"{'':<28}{'bytes/turn':>12}")
+    print(f"{'list of dicts':<28}{dict_bytes / n_turns:>12.1f}")
+    print(f"{'ConversationHistory':<28}{columnar_bytes / n_turns:>12.1f}"
+          f"  ({history.nbytes() / n_turns:.1f} without spare capacity)")
+    print(f"append {append_s / n_turns * 1e6:.2f} us/turn, "
+          f"to_frame() {frame_ms:.2f} ms, {len(frame.columns)} columns")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Import-time breakdown of the entry points (python -X importtime).
+
+Each entry point is loaded in a fresh interpreter without running its main(),
+and the cumulative import time of the heavy dependencies it pulled in is
+reported next to the total. Run from the project root:
+
+    python -m benchmarks.bench_imports
+"""
+import subprocess
+import sys
+from pathlib import Path
+
+ENTRY_POINTS = ["main.py", "app.py"] + sorted(str(p) for p in Path("pages").glob("*.py"))
+# what app.py and the pages import besides streamlit, for environments where
+# streamlit itself is not installed
+MODULES = ("chatbot.bot_logic", "chatbot.sentiment", "chatbot.storage", "chatbot.export_chat")
+HEAVY = ("sklearn", "scipy", "numpy", "vaderSentiment", "pandas", "matplotlib", "streamlit")
+
+LOADER = """
+import importlib, importlib.util, sys
+target = sys.argv[1]
+if target.endswith(".py"):
+    spec = importlib.util.spec_from_file_location("entry_point", target)
+    spec.loader.exec_module(importlib.util.module_from_spec(spec))
+else:
+    importlib.import_module(target)
+"""
+
+
+def _import_tree(stderr):
+    """Parse -X importtime output (children are printed before their parent)."""
+    stack = []  # (depth, name, cumulative us, children)
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        try:
+            _, cumulative, name = line[len("import time:"):].split("|")
+            cumulative = int(cumulative)
+        except ValueError:
+            continue  # header line
+        depth = (len(name) - len(name.lstrip())) // 2
+        children = []
+        while stack and stack[-1][0] > depth:
+            children.insert(0, stack.pop())
+        stack.append((depth, name.strip(), cumulative, children))
+    return stack
+
+
+def _heavy_times(nodes, heavy):
+    # a heavy package is charged once, including whatever it imported itself
+    for _, name, cumulative, children in nodes:
+        root = name.split(".")[0]
+        if root in HEAVY:
+            heavy[root] = heavy.get(root, 0) + cumulative / 1000
+        else:
+            _heavy_times(children, heavy)
+
+
+def import_times(target):
+    """(total ms, {heavy package: cumulative ms}, error or None) for a file or module."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", LOADER, target],
+        capture_output=True, text=True,
+    )
+    roots = _import_tree(proc.stderr)
+    heavy = {}
+    _heavy_times(roots, heavy)
+    errors = [line.strip() for line in proc.stderr.splitlines() if "Error:" in line]
+    total = sum(cumulative for _, _, cumulative, _ in roots) / 1000
+    return total, heavy, errors[-1] if errors else None
+
+
+def main():
+    print(f"{'entry point':<36}{'total ms':>10}  heavy imports (cumulative ms)")
+    for path in ENTRY_POINTS + list(MODULES):
+        total, heavy, error = import_times(path)
+        detail = ", ".join(f"{name} {ms:.0f}" for name, ms in sorted(heavy.items())) or "-"
+        print(f"{path:<36}{total:>10.0f}  {detail}")
+        if error:
+            print(f"{'':<36}{'':>10}  ({error})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Cold vs. cached bot startup.
+
+Run from the project root:
+
+    python -m benchmarks.bench_index_cache
+"""
+import shutil
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from chatbot.bot_logic import SimpleRetrievalBot, index_dir_for
+
+INTENTS_PATH = Path("intents.json")
+REPEATS = 20
+
+
+def _time_startup(intents_path, use_index_cache, clear_cache):
+    timings = []
+    for _ in range(REPEATS):
+        if clear_cache:
+            shutil.rmtree(index_dir_for(intents_path), ignore_errors=True)
+        start = time.perf_counter()
+        SimpleRetrievalBot(intents_path, use_index_cache=use_index_cache)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        intents_path = Path(tmp) / "intents.json"
+        shutil.copy(INTENTS_PATH, intents_path)
+
+        results = {
+            "no cache (fit)": _time_startup(intents_path, False, False),
+            "cold (fit + compile)": _time_startup(intents_path, True, True),
+        }
+        # warm the artifact once, then time the memory-mapped load
+        SimpleRetrievalBot(intents_path)
+        results["cached (mmap load)"] = _time_startup(intents_path, True, False)
+
+    print(f"{'mode':<24}{'median ms':>12}{'min ms':>10}")
+    for mode, timings in results.items():
+        print(f"{mode:<24}{statistics.median(timings) * 1000:>12.2f}{min(timings) * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Brute-force vs. inverted-index retrieval on a synthetic intent catalog.
+
+Run from the project root:
+
+    python -m benchmarks.bench_inverted_index [n_patterns]
+"""
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.synthetic import synthetic_intents, synthetic_queries
+from chatbot.bot_logic import SimpleRetrievalBot
+
+N_QUERIES = 500
+BATCH_SIZE = 256
+
+
+def _per_message_ms(bot, queries):
+    timings = []
+    for q in queries:
+        start = time.perf_counter()
+        bot.classify_batch([q])
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), sorted(timings)[int(len(timings) * 0.99) - 1]
+
+
+def _batch_msgs_per_sec(bot, queries):
+    start = time.perf_counter()
+    for i in range(0, len(queries), BATCH_SIZE):
+        bot.classify_batch(queries[i:i + BATCH_SIZE])
+    return len(queries) / (time.perf_counter() - start)
+
+
+def main():
+    n_patterns = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    data = synthetic_intents(n_patterns)
+    queries = synthetic_queries(N_QUERIES)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        intents_path = Path(tmp) / "intents.json"
+        intents_path.write_text(json.dumps(data))
+        bots = {
+            engine: SimpleRetrievalBot(intents_path, use_index_cache=False, engine=engine)
+            for engine in ("brute", "inverted")
+        }
+
+    assert bots["brute"].classify_batch(queries) == bots["inverted"].classify_batch(queries)
+
+    print(f"{n_patterns} patterns, {N_QUERIES} queries (results identical)")
+    print(f"{'engine':<10}{'p50 ms':>10}{'p99 ms':>10}{'batch msg/s':>14}")
+    for engine, bot in bots.items():
+        p50, p99 = _per_message_ms(bot, queries)
+        print(f"{engine:<10}{p50:>10.3f}{p99:>10.3f}{_batch_msgs_per_sec(bot, queries):>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+"""
+score_many throughput at 1, 2, 4 and 8 workers.
+
+Messages are made unique so the per-process sentiment cache does not hide
+the VADER cost. Run from the project root:
+
+    python -m benchmarks.bench_sentiment_pool [n_messages]
+"""
+import os
+import sys
+import time
+
+from benchmarks.synthetic import synthetic_messages
+from chatbot.sentiment import score_many
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    print(f"{n} messages, {os.cpu_count()} CPUs")
+    print(f"{'workers':>8}{'msg/s':>12}{'seconds':>10}")
+    for workers in (1, 2, 4, 8):
+        start = time.perf_counter()
+        count = sum(1 for _ in score_many(synthetic_messages(n), workers=workers))
+        elapsed = time.perf_counter() - start
+        print(f"{workers:>8}{count / elapsed:>12.0f}{elapsed:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
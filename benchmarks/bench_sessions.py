@@ -0,0 +1,63 @@
+"""
+Per-session cost of one bot per Streamlit session vs. one shared bot.
+
+Simulates N sessions that each obtain a bot and answer one message, and
+reports the time and the Python heap retained per session.
+
+Run from the project root:
+
+    python -m benchmarks.bench_sessions [n_sessions]
+"""
+import gc
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from chatbot.bot_logic import SimpleRetrievalBot
+
+INTENTS_PATH = Path("intents.json")
+
+
+def _simulate(n_sessions, get_bot):
+    gc.collect()
+    tracemalloc.start()
+    base, _ = tracemalloc.get_traced_memory()
+    start = time.perf_counter()
+
+    sessions = []
+    for i in range(n_sessions):
+        bot = get_bot()
+        bot.reply(f"hello {i}")
+        sessions.append({"bot": bot, "history": []})
+
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed / n_sessions * 1000, (current - base) / n_sessions / 1024
+
+
+def main():
+    n_sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    # warm imports and the compiled index so both runs start equal
+    SimpleRetrievalBot(INTENTS_PATH)
+
+    shared = SimpleRetrievalBot(INTENTS_PATH)
+    results = {
+        "per-session bot (refit)": _simulate(
+            n_sessions, lambda: SimpleRetrievalBot(INTENTS_PATH, use_index_cache=False)
+        ),
+        "per-session bot (cached index)": _simulate(
+            n_sessions, lambda: SimpleRetrievalBot(INTENTS_PATH)
+        ),
+        "shared bot": _simulate(n_sessions, lambda: shared),
+    }
+
+    print(f"{n_sessions} simulated sessions")
+    print(f"{'mode':<32}{'ms/session':>12}{'KiB/session':>14}")
+    for mode, (ms, kib) in results.items():
+        print(f"{mode:<32}{ms:>12.3f}{kib:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+One SimpleRetrievalBot per catalog vs. a single TenantRegistry.
+
+Run from the project root:
+
+    python -m benchmarks.bench_tenants [n_tenants] [patterns_per_tenant]
+
+Reports the memory allocated to hold every tenant (tracemalloc) and the
+reply latency with traffic spread over all tenants.
+"""
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from benchmarks.synthetic import synthetic_intents, synthetic_queries
+from chatbot.bot_logic import SimpleRetrievalBot
+from chatbot.tenants import TenantRegistry
+
+N_QUERIES = 2_000
+
+
+def _allocated_mb(build):
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current / 2**20
+
+
+def _p50_ms(reply, traffic):
+    timings = []
+    for tenant, q in traffic:
+        start = time.perf_counter()
+        reply(tenant, q)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    n_tenants = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    n_patterns = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    queries = synthetic_queries(N_QUERIES)
+    rng = random.Random(0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {}
+        for i in range(n_tenants):
+            paths[f"tenant{i}"] = Path(tmp) / f"tenant{i}.json"
+            paths[f"tenant{i}"].write_text(json.dumps(synthetic_intents(n_patterns, seed=i)))
+        traffic = [(rng.choice(list(paths)), q) for q in queries]
+
+        SimpleRetrievalBot(paths["tenant0"], use_index_cache=False)  # import sklearn up front
+        bots, bots_mb = _allocated_mb(lambda: {
+            tenant: SimpleRetrievalBot(path, use_index_cache=False, cache_size=0)
+            for tenant, path in paths.items()
+        })
+
+        def load_all():
+            registry = TenantRegistry(paths)
+            for tenant in paths:
+                registry.classify(tenant, "warm up")
+            return registry
+
+        registry, registry_mb = _allocated_mb(load_all)
+
+        print(f"{n_tenants} tenants x {n_patterns} patterns")
+        print(f"{'':<22}{'memory MB':>12}{'reply p50 ms':>14}")
+        print(f"{'one bot per tenant':<22}{bots_mb:>12.1f}"
+              f"{_p50_ms(lambda t, q: bots[t].reply(q), traffic):>14.3f}")
+        print(f"{'TenantRegistry':<22}{registry_mb:>12.1f}{_p50_ms(registry.reply, traffic):>14.3f}")
+
+        budget = registry.memory_usage() // 4
+        small = TenantRegistry(paths, memory_budget=budget)
+        p50 = _p50_ms(small.reply, traffic)
+        stats = small.stats()
+        print(f"budget {budget / 2**20:.1f} MB: {stats['loaded']} tenants resident, "
+              f"{stats['loads']} loads, {stats['evictions']} evictions, p50 {p50:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Load test for chatbot.server: latency percentiles and throughput with
+micro-batching on vs. the one-request-at-a-time path (max_batch=1).
+
+Starts the server in-process on a free port and drives it with N concurrent
+keep-alive clients, each sending M /reply requests.
+
+Run from the project root:
+
+    python -m benchmarks.load_test [clients] [requests_per_client]
+"""
+import asyncio
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from chatbot.bot_logic import SimpleRetrievalBot
+from chatbot.server import serve
+
+INTENTS_PATH = Path("intents.json")
+MESSAGES = [
+    "hello there", "what is your name", "thanks a lot!", "this is terrible",
+    "can you help me", "goodbye", "I love this", "tell me a joke",
+]
+
+
+async def _client(port, n_requests, latencies, rng):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        for _ in range(n_requests):
+            # unique suffix so the match cache does not answer for us
+            body = json.dumps({"text": f"{rng.choice(MESSAGES)} {rng.random():.6f}"}).encode()
+            start = time.perf_counter()
+            writer.write(
+                b"POST /reply HTTP/1.1\r\nHost: localhost\r\n"
+                b"Content-Type: application/json\r\n"
+                + f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b""):
+                    break
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":", 1)[1])
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+    finally:
+        writer.close()
+
+
+async def _run(bot, n_clients, n_requests, max_batch):
+    chat_server, server = await serve(bot, port=0, max_batch=max_batch)
+    port = server.sockets[0].getsockname()[1]
+    latencies = []
+    rng = random.Random(0)
+    start = time.perf_counter()
+    async with server:
+        await asyncio.gather(*(
+            _client(port, n_requests, latencies, rng) for _ in range(n_clients)
+        ))
+    elapsed = time.perf_counter() - start
+    chat_server.close()
+
+    batcher = chat_server.reply_batcher
+    ms = np.array(latencies) * 1000
+    return {
+        "p50": float(np.percentile(ms, 50)),
+        "p99": float(np.percentile(ms, 99)),
+        "rps": len(latencies) / elapsed,
+        "avg_batch": batcher.items / batcher.batches if batcher.batches else 0.0,
+    }
+
+
+def main():
+    n_clients = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    n_requests = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    bot = SimpleRetrievalBot(INTENTS_PATH, cache_size=0)
+    bot.answer_batch(MESSAGES)  # warm up
+
+    print(f"{n_clients} clients x {n_requests} requests")
+    print(f"{'mode':<20}{'p50 ms':>10}{'p99 ms':>10}{'req/s':>10}{'avg batch':>12}")
+    for mode, max_batch in (("one-at-a-time", 1), ("micro-batched", 64)):
+        r = asyncio.run(_run(bot, n_clients, n_requests, max_batch))
+        print(f"{mode:<20}{r['p50']:>10.2f}{r['p99']:>10.2f}{r['rps']:>10.0f}{r['avg_batch']:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""
+Benchmark suite: retrieval, sentiment, analytics and persistence on
+synthetic data, saved as JSON and optionally compared against a baseline.
+
+Run from the project root:
+
+    python -m benchmarks.run --output bench.json
+    python -m benchmarks.run --baseline bench.json --threshold 0.15
+
+With --baseline the exit status is 1 if any metric got worse by more than
+the threshold (a fraction), so it can gate CI. --quick shrinks every size
+for a smoke run.
+"""
+import argparse
+import contextlib
+import io
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from benchmarks.synthetic import (
+    synthetic_history,
+    synthetic_intents,
+    synthetic_messages,
+    synthetic_queries,
+)
+from chatbot.bot_logic import SimpleRetrievalBot
+from chatbot.export_chat import export_chat
+from chatbot.history import save_history
+from chatbot.sentiment import (
+    RunningSummary,
+    analyze_trend,
+    clear_sentiment_cache,
+    score_many,
+    summarize_conversation,
+)
+from chatbot.storage import ChatStore
+
+# unit -> True if a smaller value is better
+UNITS = {"ms": True, "msg/s": False}
+
+SIZES = {
+    "catalog_patterns": (1_000, 10_000, 100_000),
+    "queries": 300,
+    "messages": 20_000,
+    "history_turns": (100, 10_000),
+    "repeats": 5,
+}
+QUICK_SIZES = {
+    "catalog_patterns": (200, 2_000),
+    "queries": 50,
+    "messages": 1_000,
+    "history_turns": (100, 1_000),
+    "repeats": 2,
+}
+
+
+def _median_ms(func, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def bench_retrieval(sizes, tmp):
+    results = {}
+    queries = synthetic_queries(sizes["queries"])
+    for n_patterns in sizes["catalog_patterns"]:
+        intents_path = Path(tmp) / f"intents_{n_patterns}.json"
+        intents_path.write_text(json.dumps(synthetic_intents(n_patterns)))
+
+        results[f"construct.build.{n_patterns}"] = _median_ms(
+            lambda: SimpleRetrievalBot(intents_path, use_index_cache=False), sizes["repeats"]
+        )
+        SimpleRetrievalBot(intents_path)  # writes the compiled index
+        results[f"construct.cached.{n_patterns}"] = _median_ms(
+            lambda: SimpleRetrievalBot(intents_path), sizes["repeats"]
+        )
+
+        bot = SimpleRetrievalBot(intents_path, cache_size=0)
+        latencies = []
+        for q in queries:
+            start = time.perf_counter()
+            bot.reply(q)
+            latencies.append((time.perf_counter() - start) * 1000)
+        results[f"reply.p50.{n_patterns}"] = _percentile(latencies, 0.5)
+        results[f"reply.p99.{n_patterns}"] = _percentile(latencies, 0.99)
+    return {name: (value, "ms") for name, value in results.items()}
+
+
+def bench_sentiment(sizes):
+    n = sizes["messages"]
+    clear_sentiment_cache()
+    start = time.perf_counter()
+    count = sum(1 for _ in score_many(synthetic_messages(n)))
+    rate = count / (time.perf_counter() - start)
+    return {f"sentiment.throughput.{n}": (rate, "msg/s")}
+
+
+def bench_summaries(sizes):
+    results = {}
+    for n_turns in sizes["history_turns"]:
+        history = synthetic_history(n_turns)
+        scores = [turn["score"] for turn in history]
+        results[f"summary.batch.{n_turns}"] = (_median_ms(
+            lambda: (summarize_conversation(history), analyze_trend(scores)), sizes["repeats"]
+        ), "ms")
+        results[f"summary.running.{n_turns}"] = (_median_ms(
+            lambda: RunningSummary(scores).trend(), sizes["repeats"]
+        ), "ms")
+    return results
+
+
+def bench_persistence(sizes, tmp):
+    results = {}
+    for n_turns in sizes["history_turns"]:
+        history = synthetic_history(n_turns)
+        log_path = Path(tmp) / f"history_{n_turns}.jsonl"
+        export_path = Path(tmp) / f"export_{n_turns}.txt"
+        store = ChatStore(str(Path(tmp) / f"chats_{n_turns}.db"))
+
+        results[f"save_history.{n_turns}"] = _median_ms(
+            lambda: save_history(history, filename=log_path), sizes["repeats"]
+        )
+        results[f"store.save_conversation.{n_turns}"] = _median_ms(
+            lambda: store.save_conversation(history, overall="Neutral", trend=""), sizes["repeats"]
+        )
+        with contextlib.redirect_stdout(io.StringIO()):  # export_chat prints the path
+            results[f"export_chat.{n_turns}"] = _median_ms(
+                lambda: export_chat(history, filename=export_path), sizes["repeats"]
+            )
+    return {name: (value, "ms") for name, value in results.items()}
+
+
+def run_suite(quick=False):
+    sizes = QUICK_SIZES if quick else SIZES
+    measured = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        measured.update(bench_retrieval(sizes, tmp))
+        measured.update(bench_sentiment(sizes))
+        measured.update(bench_summaries(sizes))
+        measured.update(bench_persistence(sizes, tmp))
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "quick": quick,
+        },
+        "results": {
+            name: {"value": value, "unit": unit} for name, (value, unit) in measured.items()
+        },
+    }
+
+
+def compare(current, baseline, threshold=0.10):
+    """
+    Return [(name, baseline value, current value, relative change)] for every
+    metric present in both runs that got worse by more than `threshold`.
+    The change is positive when worse, whatever the unit's direction.
+    """
+    regressions = []
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None or base["unit"] != result["unit"] or not base["value"]:
+            continue
+        change = (result["value"] - base["value"]) / base["value"]
+        if not UNITS[result["unit"]]:
+            change = -change
+        if change > threshold:
+            regressions.append((name, base["value"], result["value"], change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the benchmark suite.")
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--baseline", help="results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="allowed slowdown as a fraction (default 0.10)")
+    parser.add_argument("--quick", action="store_true", help="small sizes for a smoke run")
+    args = parser.parse_args()
+
+    report = run_suite(quick=args.quick)
+    print(f"{'benchmark':<36}{'value':>14}  unit")
+    for name, result in report["results"].items():
+        print(f"{name:<36}{result['value']:>14.3f}  {result['unit']}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        for name, before, after, change in regressions:
+            print(f"REGRESSION {name}: {before:.3f} -> {after:.3f} ({change:+.0%})")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.threshold:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
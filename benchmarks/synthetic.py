@@ -0,0 +1,69 @@
+"""
+Deterministic synthetic data for the benchmarks: intent catalogs, message
+streams and long conversation histories.
+"""
+import itertools
+import random
+
+from chatbot.sentiment import score_to_label
+
+VOCAB_SIZE = 20000
+PATTERNS_PER_INTENT = 20
+
+# words VADER has opinions about, so message scores are spread over all labels
+SENTIMENT_WORDS = (
+    "i really love this service great thanks but the delivery was late and "
+    "terrible not happy at all it is okay i guess awesome support bad app"
+).split()
+
+
+def _zipf_vocab(vocab_size):
+    vocab = [f"w{i}" for i in range(vocab_size)]
+    # Zipf-like word frequencies, like natural text
+    weights = list(itertools.accumulate(1.0 / (i + 1) for i in range(vocab_size)))
+    return vocab, weights
+
+
+def synthetic_intents(n_patterns, patterns_per_intent=PATTERNS_PER_INTENT,
+                      vocab_size=VOCAB_SIZE, seed=0):
+    """An intents.json-shaped dict with n_patterns patterns."""
+    rng = random.Random(seed)
+    vocab, weights = _zipf_vocab(vocab_size)
+    intents = []
+    for start in range(0, n_patterns, patterns_per_intent):
+        tag = f"intent_{start // patterns_per_intent}"
+        patterns = [
+            " ".join(rng.choices(vocab, cum_weights=weights, k=rng.randint(2, 6)))
+            for _ in range(min(patterns_per_intent, n_patterns - start))
+        ]
+        intents.append({"tag": tag, "patterns": patterns, "responses": [f"reply {tag}"]})
+    return {"intents": intents}
+
+
+def synthetic_queries(n, vocab_size=VOCAB_SIZE, seed=1):
+    """Queries over the same Zipf vocabulary as synthetic_intents."""
+    rng = random.Random(seed)
+    vocab, weights = _zipf_vocab(vocab_size)
+    return [" ".join(rng.choices(vocab, cum_weights=weights, k=rng.randint(2, 8))) for _ in range(n)]
+
+
+def synthetic_messages(n, seed=0):
+    """Yield n unique chat messages, so no cache can answer for the scorer."""
+    rng = random.Random(seed)
+    for i in range(n):
+        yield " ".join(rng.choices(SENTIMENT_WORDS, k=rng.randint(3, 15))) + f" #{i}"
+
+
+def synthetic_history(n_turns, seed=0):
+    """A conversation of n_turns turns shaped like the app's history."""
+    rng = random.Random(seed)
+    history = []
+    for i, text in enumerate(synthetic_messages(n_turns, seed)):
+        score = round(rng.uniform(-1.0, 1.0), 4)
+        history.append({
+            "User_text": text,
+            "Bot_reply": f"reply {i}",
+            "label": score_to_label(score),
+            "score": score,
+        })
+    return history
@@ -0,0 +1,195 @@
+"""
+NumPy versions of the conversation analytics in chatbot.sentiment.
+
+Many conversations are passed as one flat score array plus an offsets array
+(conversation i is scores[offsets[i]:offsets[i + 1]]), so 100k stored chats
+are summarized in a handful of array operations instead of a Python loop.
+"""
+import numpy as np
+
+# label codes, ordered so that code - 1 is the sign of the sentiment
+NEGATIVE, NEUTRAL, POSITIVE = 0, 1, 2
+LABELS = ("Negative", "Neutral", "Positive")
+
+# analyze_trend cases, in the order analyze_trend checks them
+_TREND_TEMPLATES = (
+    "Not enough data to determine mood trend.",
+    "Tone remained consistently {start} throughout the conversation.",
+    "Tone improved significantly — conversation moved from negative to positive.",
+    "Tone improved slightly — started negative but recovered to neutral.",
+    "Tone declined significantly — conversation turned from positive to negative.",
+    "Tone became less positive — conversation softened to neutral.",
+    "Tone fluctuated frequently with mixed emotional shifts.",
+    "Tone shifted from {start} to {end}.",
+    "Conversation started {start}, shifted to {mid} midway, and ended {end}.",
+    "Mood trend shows mixed shifts over time.",
+)
+
+
+def label_codes(scores):
+    """Label code per score, same thresholds as score_to_label."""
+    scores = np.asarray(scores, dtype=np.float64)
+    codes = np.full(scores.shape, NEUTRAL, dtype=np.int8)
+    codes[scores >= 0.05] = POSITIVE
+    codes[scores <= -0.05] = NEGATIVE
+    return codes
+
+
+# below this many conversations still being summed, _segment_sums switches
+# from one lock-step vector add per message to one cumsum per conversation
+LOCKSTEP_MIN_ACTIVE = 16
+
+
+def _as_offsets(scores, offsets):
+    scores = np.asarray(scores, dtype=np.float64)
+    if offsets is None:
+        offsets = np.array([0, len(scores)])
+    offsets = np.asarray(offsets, dtype=np.int64)
+    if offsets[0] != 0 or offsets[-1] != len(scores) or np.any(np.diff(offsets) < 0):
+        raise ValueError("offsets must start at 0, end at len(scores) and not decrease")
+    return scores, offsets
+
+
+def _segment_sums(values, offsets):
+    """
+    Sum of each conversation's values, added strictly left to right.
+
+    That is the summation RunningSummary defines (and summarize_conversation
+    uses), so for float64 input the sums, and the labels derived from them,
+    are bit-identical to chatbot.sentiment on every Python version. Neither
+    np.add.reduceat (pairwise) nor sum() on 3.12+ (compensated) adds in that
+    order, and either can move a chat sitting on the 0.05 threshold.
+
+    Many short conversations: they are sorted by length and the j-th message
+    of every conversation still that long is added in one vector step. Few
+    long ones: once fewer than LOCKSTEP_MIN_ACTIVE are left, each is finished
+    with np.cumsum, which is also sequential, in one call per conversation.
+    """
+    if np.issubdtype(values.dtype, np.integer):
+        # integer sums are exact in any order
+        cumulative = np.concatenate(([0], np.cumsum(values)))
+        return cumulative[offsets[1:]] - cumulative[offsets[:-1]]
+
+    lengths = np.diff(offsets)
+    order = np.argsort(-lengths, kind="stable")
+    sorted_lengths = lengths[order]
+    sorted_starts = offsets[:-1][order]
+
+    acc = np.zeros(len(lengths), dtype=values.dtype)
+    longest = int(sorted_lengths[0]) if len(lengths) else 0
+    j = 0
+    while j < longest:
+        active = np.searchsorted(-sorted_lengths, -j, side="left")
+        if active < LOCKSTEP_MIN_ACTIVE:
+            for i in range(active):
+                rest = values[sorted_starts[i] + j:sorted_starts[i] + sorted_lengths[i]]
+                acc[i] = np.cumsum(np.concatenate(([acc[i]], rest)))[-1]
+            break
+        acc[:active] += values[sorted_starts[:active] + j]
+        j += 1
+
+    sums = np.empty_like(acc)
+    sums[order] = acc
+    return sums
+
+
+def weighted_scores(scores, offsets=None):
+    """
+    Per-conversation sum(s * |s|) / sum(|s|), as in summarize_conversation.
+    Empty or all-zero conversations get NaN.
+    """
+    scores, offsets = _as_offsets(scores, offsets)
+    weights = np.abs(scores)
+    total_weight = _segment_sums(weights, offsets)
+    weighted = _segment_sums(scores * weights, offsets)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(total_weight == 0, np.nan, weighted / total_weight)
+
+
+def summarize_many(scores, offsets=None):
+    """
+    Overall label code per conversation. Empty and emotionally flat
+    conversations are NEUTRAL, matching the label summarize_conversation
+    reports for them.
+    """
+    weighted = weighted_scores(scores, offsets)
+    return label_codes(np.nan_to_num(weighted, nan=0.0))
+
+
+def transition_counts(scores, offsets=None):
+    """Number of label changes between consecutive messages of each conversation."""
+    scores, offsets = _as_offsets(scores, offsets)
+    codes = label_codes(scores)
+    changed = np.zeros(len(codes), dtype=np.int64)
+    changed[1:] = codes[1:] != codes[:-1]
+    # a change across a conversation boundary is not a transition
+    starts = offsets[:-1][np.diff(offsets) > 0]
+    changed[starts] = 0
+    return _segment_sums(changed, offsets)
+
+
+def trend_cases(scores, offsets=None):
+    """
+    Which analyze_trend branch applies to each conversation, plus the start,
+    mid and end label codes needed to format it.
+    """
+    scores, offsets = _as_offsets(scores, offsets)
+    codes = label_codes(scores)
+    lengths = np.diff(offsets)
+    transitions = transition_counts(scores, offsets)
+
+    # empty conversations index a dummy code; their case is decided by length
+    padded = np.append(codes, np.int8(NEUTRAL))
+    empty = lengths == 0
+    start = padded[np.where(empty, len(codes), offsets[:-1])]
+    end = padded[np.where(empty, len(codes), offsets[1:] - 1)]
+    mid = padded[np.where(empty, len(codes), offsets[:-1] + lengths // 2)]
+
+    conditions = [
+        lengths < 2,
+        transitions == 0,
+        (start == NEGATIVE) & (end == POSITIVE),
+        (start == NEGATIVE) & (end == NEUTRAL),
+        (start == POSITIVE) & (end == NEGATIVE),
+        (start == POSITIVE) & (end == NEUTRAL),
+        transitions >= 3,
+        (start != end) & (transitions == 1),
+        (start != mid) | (mid != end),
+    ]
+    cases = np.select(conditions, np.arange(len(conditions)), default=len(conditions))
+    return cases, start, mid, end
+
+
+def trend_many(scores, offsets=None):
+    """Mood trend text per conversation, identical to analyze_trend."""
+    cases, start, mid, end = trend_cases(scores, offsets)
+    names = [label.lower() for label in LABELS]
+    return [
+        _TREND_TEMPLATES[c].format(start=names[s], mid=names[m], end=names[e])
+        for c, s, m, e in zip(cases.tolist(), start.tolist(), mid.tolist(), end.tolist())
+    ]
+
+
+def downsample_minmax(scores, max_points):
+    """
+    Positions of at most max_points scores that keep the shape of a long
+    conversation for plotting: the scores are cut into equal buckets and the
+    minimum and maximum of each bucket are kept, so spikes never disappear.
+    Returns (positions, values); short conversations come back unchanged.
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    n = len(scores)
+    if n <= max_points:
+        return np.arange(n), scores
+
+    bucket = -(-n // max(max_points // 2, 1))
+    n_buckets = -(-n // bucket)
+    # pad with the last score; argmin/argmax return the first occurrence,
+    # so a padded slot is never picked over the real one
+    padded = np.pad(scores, (0, n_buckets * bucket - n), mode="edge").reshape(n_buckets, bucket)
+    base = np.arange(n_buckets) * bucket
+    positions = np.unique(np.concatenate((
+        base + padded.argmin(axis=1),
+        base + padded.argmax(axis=1),
+    )))
+    return positions, scores[positions]
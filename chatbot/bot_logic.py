@@ -1,48 +1,947 @@
+import hashlib
 import json
+import logging
+import os
 import random
+import shutil
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
 from pathlib import Path
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+
+import numpy as np
+
+from chatbot.cache import LRUCache, normalize_text
+from chatbot.metrics import timed, timer
+
+logger = logging.getLogger(__name__)
+
+FALLBACK_RESPONSES = [
+    "Sorry, I didn't understand. Could you rephrase?",
+    "I'm not sure I follow — can you tell me more?"
+]
+EMPTY_INPUT_RESPONSE = "Please say something."
+
+# max cells of the dense (messages x n_patterns) similarity block scored at
+# once (32 MB of float64); larger catalogs get proportionally fewer messages
+MAX_SIM_CELLS = 2 ** 22
+# messages per sparse product when the inverted engine walks the postings;
+# no dense block is built there, so catalog size does not shrink the chunk
+CANDIDATE_CHUNK_SIZE = 1024
+
+# "brute" scores every pattern densely, "inverted" only touches patterns that
+# share a term with the message by walking the term -> pattern postings
+ENGINES = ("brute", "inverted")
+
+TOKEN_PATTERN = r"(?u)\b\w+\b"
+
+# "hashed" backend: width of the hashed word feature space
+WORD_HASH_FEATURES = 2 ** 18
+
+# "dense" backend: hashed character n-grams projected to DENSE_DIM dimensions
+CHAR_NGRAMS = (2, 4)
+CHAR_HASH_FEATURES = 2 ** 20
+DENSE_DIM = 128
+# bump when the on-disk index layout or the vectorizer settings change
+INDEX_FORMAT_VERSION = 2
+
+
+def intents_hash(intents_path: Path) -> str:
+    """Content hash of an intents file, used as the compiled index key."""
+    h = hashlib.sha256()
+    h.update(f"v{INDEX_FORMAT_VERSION}:{TOKEN_PATTERN}\n".encode("utf-8"))
+    with open(intents_path, "rb") as f:
+        h.update(f.read())
+    return h.hexdigest()
+
+
+def index_dir_for(intents_path: Path) -> Path:
+    """Compiled index directory stored next to the intents file."""
+    intents_path = Path(intents_path)
+    return intents_path.with_name(intents_path.name + ".index")
+
+
+def diff_intents(old_data, new_data):
+    """Tags added, removed and changed (patterns or responses) between two intents files."""
+    old = {i["tag"]: i for i in old_data.get("intents", [])}
+    new = {i["tag"]: i for i in new_data.get("intents", [])}
+    return {
+        "added": [t for t in new if t not in old],
+        "removed": [t for t in old if t not in new],
+        "changed": [
+            t for t in new
+            if t in old and (
+                old[t].get("patterns", []) != new[t].get("patterns", [])
+                or old[t].get("responses", []) != new[t].get("responses", [])
+            )
+        ],
+    }
+
+
+def _parse_intents(data):
+    """Flatten intents JSON into (pattern_texts, pattern_to_tag, tag_to_responses)."""
+    pattern_texts = []
+    pattern_to_tag = []
+    tag_to_responses = {}
+    for intent in data.get("intents", []):
+        tag = intent["tag"]
+        responses = intent.get("responses", [])
+        patterns = intent.get("patterns", [])
+        tag_to_responses[tag] = responses
+        for p in patterns:
+            pattern_texts.append(p)
+            pattern_to_tag.append(tag)
+    return pattern_texts, pattern_to_tag, tag_to_responses
+
+
+# scipy and sklearn are imported where an index is built or loaded, so
+# importing this module (app.py, main.py --help, the pages) stays cheap
+
+def _chunk_rows(n_patterns):
+    """Messages per similarity chunk for a catalog of n_patterns."""
+    return max(1, MAX_SIM_CELLS // max(n_patterns, 1))
+
+
+def _make_vectorizer(vocabulary, idf):
+    """A fitted TfidfVectorizer from a vocabulary and IDF weights."""
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    vectorizer = TfidfVectorizer(lowercase=True, token_pattern=TOKEN_PATTERN)
+    vectorizer.vocabulary_ = vocabulary
+    vectorizer.idf_ = idf
+    return vectorizer
+
+
+def _make_counter(vocabulary=None):
+    from sklearn.feature_extraction.text import CountVectorizer
+
+    return CountVectorizer(
+        lowercase=True, token_pattern=TOKEN_PATTERN, dtype=np.float64, vocabulary=vocabulary
+    )
+
+
+class RetrievalIndex(ABC):
+    """
+    Immutable snapshot of everything needed to answer a message.
+
+    The bot swaps whole snapshots on reload, so a reply that grabbed the
+    index once never sees a half-built state. A backend must implement build,
+    load, save and similarities (an (n_texts x n_patterns) score array);
+    the tag bookkeeping used for ranking is shared.
+    """
+
+    # appended to the intents hash to name the compiled index directory
+    CACHE_SUFFIX = ""
+
+    def __init__(self, pattern_texts, pattern_to_tag, tag_to_responses):
+        self.pattern_texts = pattern_texts
+        self.pattern_to_tag = pattern_to_tag
+        self.tag_to_responses = tag_to_responses
+        self._build_tag_index()
+
+    @classmethod
+    @abstractmethod
+    def build(cls, data):
+        """Index intents JSON data."""
+
+    @classmethod
+    @abstractmethod
+    def load(cls, cache_dir: Path):
+        """Read an index written by save()."""
+
+    @abstractmethod
+    def save(self, cache_dir: Path):
+        """Write the index to cache_dir."""
+
+    @abstractmethod
+    def similarities(self, texts):
+        """(n_texts x n_patterns) array of scores."""
+
+    def best_candidates(self, texts):
+        """Best pattern per text as (indices, scores)."""
+        sims = self.similarities(texts)
+        best_idx = sims.argmax(axis=1)
+        return best_idx, sims[np.arange(len(texts)), best_idx]
+
+    def updated(self, data):
+        """Return a new index for changed intents JSON."""
+        return type(self).build(data)
+
+    def to_intents(self):
+        """Rebuild intents JSON data from the index (pattern order is kept)."""
+        patterns = {tag: [] for tag in self.tag_to_responses}
+        for text, tag in zip(self.pattern_texts, self.pattern_to_tag):
+            patterns[tag].append(text)
+        return {
+            "intents": [
+                {"tag": tag, "patterns": patterns[tag], "responses": responses}
+                for tag, responses in self.tag_to_responses.items()
+            ]
+        }
+
+    def _build_tag_index(self):
+        from scipy import sparse
+
+        tag_codes = {}
+        for tag in self.pattern_to_tag:
+            tag_codes.setdefault(tag, len(tag_codes))
+        self.tags = list(tag_codes)
+        codes = np.array([tag_codes[t] for t in self.pattern_to_tag], dtype=np.int64)
+        n_patterns = len(codes)
+
+        # (n_patterns x n_tags) 0/1 matrix: sims @ indicator sums scores per tag
+        self.tag_indicator = sparse.csr_matrix(
+            (np.ones(n_patterns), (np.arange(n_patterns), codes)),
+            shape=(n_patterns, len(self.tags)),
+        )
+        self.tag_counts = np.bincount(codes, minlength=len(self.tags))
+        # patterns grouped by tag so per-tag maxima are one reduceat call;
+        # intents files list them grouped already, and then no column
+        # permutation (and copy of the similarity block) is needed
+        order = np.argsort(codes, kind="stable")
+        self.tag_order = None if np.array_equal(order, np.arange(n_patterns)) else order
+        self.tag_starts = np.concatenate(([0], np.cumsum(self.tag_counts)[:-1]))
+
+    def _write(self, cache_dir: Path, arrays, meta):
+        """Write arrays and meta to a temp dir and rename it into place."""
+        root = cache_dir.parent
+        try:
+            root.mkdir(parents=True, exist_ok=True)
+            tmp_dir = Path(tempfile.mkdtemp(prefix=".tmp-", dir=root))
+            for name, array in arrays.items():
+                np.save(tmp_dir / f"{name}.npy", array)
+            with open(tmp_dir / "meta.json", "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            try:
+                os.rename(tmp_dir, cache_dir)
+            except OSError:
+                # another process compiled the same intents first
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+        except OSError:
+            # read-only checkout: serving still works, just without the cache
+            return
+
+        # drop this backend's artifacts compiled from older intents files
+        # (same "<hash><suffix>" name shape, other backends are left alone)
+        for old in root.iterdir():
+            if (old != cache_dir and len(old.name) == len(cache_dir.name)
+                    and old.name.endswith(self.CACHE_SUFFIX)
+                    and not old.name.startswith(".tmp-")):
+                shutil.rmtree(old, ignore_errors=True)
+
+
+class IntentIndex(RetrievalIndex):
+    """Word-level TF-IDF with cosine similarity (the default backend)."""
+
+    def __init__(self, pattern_texts, pattern_to_tag, tag_to_responses, vectorizer,
+                 tfidf_t, counts_t):
+        self.vectorizer = vectorizer
+        # (terms x patterns); rows are the postings lists and its transpose is
+        # a zero-copy CSC view of the L2-normalized pattern matrix
+        self.tfidf_t = tfidf_t
+        self.tfidf = tfidf_t.T
+        # raw term counts in the same layout, so a reload only has to
+        # tokenize the patterns that actually changed
+        self.counts_t = counts_t
+        super().__init__(pattern_texts, pattern_to_tag, tag_to_responses)
+
+    @classmethod
+    def build(cls, data):
+        pattern_texts, pattern_to_tag, tag_to_responses = _parse_intents(data)
+        counter = _make_counter()
+        counts = counter.fit_transform(pattern_texts)
+        return cls._from_counts(
+            pattern_texts, pattern_to_tag, tag_to_responses, counter.vocabulary_, counts
+        )
+
+    @classmethod
+    def _from_counts(cls, pattern_texts, pattern_to_tag, tag_to_responses, vocabulary, counts):
+        # same steps as TfidfVectorizer.fit_transform after counting; rows
+        # are put in column order first so an incremental rebuild sums each
+        # row norm in the same order as a full one
+        from sklearn.feature_extraction.text import TfidfTransformer
+
+        counts.sort_indices()
+        transformer = TfidfTransformer()
+        transformer.fit(counts)
+        tfidf = transformer.transform(counts, copy=True)
+        return cls(
+            pattern_texts,
+            pattern_to_tag,
+            tag_to_responses,
+            _make_vectorizer(vocabulary, transformer.idf_),
+            tfidf.T.tocsr(),
+            counts.T.tocsr(),
+        )
+
+    @classmethod
+    def load(cls, cache_dir: Path):
+        """Load a compiled index, memory-mapping the numeric arrays."""
+        from scipy import sparse
+
+        with open(cache_dir / "meta.json", "r", encoding="utf-8") as f:
+            meta = json.load(f)
+
+        arrays = {
+            name: np.load(cache_dir / f"{name}.npy", mmap_mode="r")
+            for name in ("idf", "data", "counts", "indices", "indptr", "pattern_tags")
+        }
+        n_terms, n_patterns = meta["shape"]
+        if (len(arrays["idf"]) != n_terms
+                or len(arrays["pattern_tags"]) != n_patterns
+                or len(arrays["counts"]) != len(arrays["data"])):
+            raise ValueError(f"Inconsistent compiled index in {cache_dir}")
+
+        tags = meta["tags"]
+        shape = (n_terms, n_patterns)
+        structure = (arrays["indices"], arrays["indptr"])
+        return cls(
+            meta["patterns"],
+            [tags[i] for i in arrays["pattern_tags"]],
+            meta["responses"],
+            cls._vectorizer_from(meta, arrays["idf"]),
+            sparse.csr_matrix((arrays["data"],) + structure, shape=shape, copy=False),
+            sparse.csr_matrix((arrays["counts"],) + structure, shape=shape, copy=False),
+        )
+
+    @staticmethod
+    def _vectorizer_from(meta, idf):
+        vocabulary = {term: i for i, term in enumerate(meta["vocabulary"])}
+        return _make_vectorizer(vocabulary, idf)
+
+    def _vectorizer_meta(self):
+        vocabulary = [None] * len(self.vectorizer.vocabulary_)
+        for term, i in self.vectorizer.vocabulary_.items():
+            vocabulary[i] = term
+        return {"vocabulary": vocabulary}
+
+    def save(self, cache_dir: Path):
+        tags = list(self.tag_to_responses)
+        tag_codes = {tag: i for i, tag in enumerate(tags)}
+        meta = {
+            "shape": list(self.tfidf_t.shape),
+            "tags": tags,
+            "responses": self.tag_to_responses,
+            "patterns": self.pattern_texts,
+            **self._vectorizer_meta(),
+        }
+
+        arrays = {
+            "idf": self.vectorizer.idf_,
+            "data": self.tfidf_t.data,
+            "counts": self.counts_t.data,
+            "indices": self.tfidf_t.indices,
+            "indptr": self.tfidf_t.indptr,
+            "pattern_tags": np.array([tag_codes[t] for t in self.pattern_to_tag], dtype=np.int32),
+        }
+        self._write(cache_dir, arrays, meta)
+
+    def updated(self, data):
+        """
+        Return a new index for changed intents JSON.
+
+        Patterns whose text is already indexed reuse their stored count row;
+        only new or edited patterns are tokenized, then the IDF weighting is
+        redone as one vectorized pass. If the vocabulary would change (an
+        unknown token appears or a term loses its last pattern) the index is
+        refit from scratch. Either way the result equals IntentIndex.build(data).
+        """
+        pattern_texts, pattern_to_tag, tag_to_responses = _parse_intents(data)
+        vocabulary = self.vectorizer.vocabulary_
+        analyze = self.vectorizer.build_analyzer()
+
+        def count_new(new_texts):
+            if any(tok not in vocabulary for text in new_texts for tok in analyze(text)):
+                return None
+            return _make_counter(vocabulary).transform(new_texts)
+
+        counts = self._reuse_counts(pattern_texts, count_new) if pattern_texts else None
+        if counts is None or np.any(np.bincount(counts.indices, minlength=len(vocabulary)) == 0):
+            return IntentIndex.build(data)
+
+        return IntentIndex._from_counts(
+            pattern_texts, pattern_to_tag, tag_to_responses, vocabulary, counts
+        )
+
+    def _reuse_counts(self, pattern_texts, count_new):
+        """
+        Count rows for pattern_texts, in order. Texts already indexed reuse
+        their stored row; the others are counted once by count_new(new_texts),
+        which may return None to give up (and then so does this).
+        """
+        from scipy import sparse
+
+        old_rows = {}
+        for i, text in enumerate(self.pattern_texts):
+            old_rows.setdefault(text, i)
+        new_texts = list(dict.fromkeys(t for t in pattern_texts if t not in old_rows))
+        new_counts = count_new(new_texts)
+        if new_counts is None:
+            return None
+
+        # old count rows first, then the freshly counted ones, gathered in
+        # the new pattern order
+        old_counts = self.counts_t.T.tocsr()
+        stacked = sparse.vstack([old_counts, new_counts], format="csr")
+        new_row = {text: old_counts.shape[0] + i for i, text in enumerate(new_texts)}
+        return stacked[[old_rows.get(t, new_row.get(t)) for t in pattern_texts]]
+
+    def similarities(self, texts):
+        with timer("bot.transform"):
+            user_vecs = self.vectorizer.transform(texts)
+        with timer("bot.similarity"):
+            return (user_vecs @ self.tfidf_t).toarray()  # shape (n_texts, n_patterns)
+
+    def best_candidates(self, texts):
+        """
+        Best pattern per text, scoring only candidate patterns.
+
+        Rows of the (terms x patterns) matrix are the postings lists, so the
+        sparse product below only accumulates patterns that share a term with
+        the message and the result is never densified to n_patterns. Ties resolve
+        to the lowest pattern index and messages with no known term get
+        (0, 0.0), exactly like argmax over the dense similarities.
+        """
+        with timer("bot.transform"):
+            user_vecs = self.vectorizer.transform(texts)
+        with timer("bot.similarity"):
+            sims = (user_vecs @ self.tfidf_t).tocsr()
+
+        n_texts = len(texts)
+        best_idx = np.zeros(n_texts, dtype=np.int64)
+        best_scores = np.zeros(n_texts)
+        row_nnz = np.diff(sims.indptr)
+        rows = np.flatnonzero(row_nnz)
+        if len(rows) == 0:
+            return best_idx, best_scores
+
+        starts = sims.indptr[rows]
+        row_max = np.maximum.reduceat(sims.data, starts)
+        is_max = sims.data == np.repeat(row_max, row_nnz[rows])
+        # lowest pattern index among the maxima of each row
+        masked = np.where(is_max, sims.indices, sims.shape[1])
+        best_idx[rows] = np.minimum.reduceat(masked, starts)
+        best_scores[rows] = row_max
+        return best_idx, best_scores
+
+
+def _word_hasher(n_features=WORD_HASH_FEATURES):
+    from sklearn.feature_extraction.text import HashingVectorizer
+
+    return HashingVectorizer(
+        lowercase=True, token_pattern=TOKEN_PATTERN, n_features=n_features,
+        alternate_sign=False, norm=None, dtype=np.float64,
+    )
+
+
+def _hashed_tfidf(counts):
+    """
+    Return (counts, idf, tfidf) for hashed pattern counts: the counts as CSR
+    with sorted indices, the smoothed IDF TfidfTransformer would compute (0 for
+    unused buckets) and the L2-normalised TF-IDF rows.
+    """
+    from scipy import sparse
+    from sklearn.preprocessing import normalize
+
+    counts = counts.tocsr()
+    counts.sort_indices()
+    n_patterns = counts.shape[0]
+    df = np.bincount(counts.indices, minlength=counts.shape[1])
+    idf = np.where(df > 0, np.log((1 + n_patterns) / (1 + df)) + 1, 0.0)
+    return counts, idf, normalize(counts @ sparse.diags(idf))
+
+
+class _HashedTfidf:
+    """
+    transform()-only stand-in for a fitted TfidfVectorizer over hashed word
+    features. Features no pattern uses have an IDF of 0, so unknown words
+    drop out of the query norm exactly as out-of-vocabulary words do.
+    """
+
+    def __init__(self, idf):
+        self.idf_ = idf
+        self._hasher = _word_hasher(len(idf))
+
+    def transform(self, texts):
+        from sklearn.preprocessing import normalize
+
+        counts = self._hasher.transform(texts)
+        counts.data *= self.idf_[counts.indices]
+        return normalize(counts)
+
+    def build_analyzer(self):
+        return self._hasher.build_analyzer()
+
+
+class HashedIntentIndex(IntentIndex):
+    """
+    Word TF-IDF over a fixed-width hashed feature space.
+
+    There is no vocabulary dict to fit, store or grow: memory is bounded by
+    WORD_HASH_FEATURES plus the nonzeros, and any new pattern can be added by
+    hashing just that pattern. Scoring reuses IntentIndex (both engines);
+    matches only differ from it when two words share a hash bucket.
+    """
+
+    CACHE_SUFFIX = "-hashed"
+
+    @classmethod
+    def build(cls, data):
+        pattern_texts, pattern_to_tag, tag_to_responses = _parse_intents(data)
+        counts = _word_hasher().transform(pattern_texts)
+        return cls._from_counts(pattern_texts, pattern_to_tag, tag_to_responses, counts)
+
+    @classmethod
+    def _from_counts(cls, pattern_texts, pattern_to_tag, tag_to_responses, counts):
+        counts, idf, tfidf = _hashed_tfidf(counts)
+        return cls(
+            pattern_texts,
+            pattern_to_tag,
+            tag_to_responses,
+            _HashedTfidf(idf),
+            tfidf.T.tocsr(),
+            counts.T.tocsr(),
+        )
+
+    @staticmethod
+    def _vectorizer_from(meta, idf):
+        return _HashedTfidf(idf)
+
+    def _vectorizer_meta(self):
+        return {}
+
+    def updated(self, data):
+        """
+        Return a new index for changed intents JSON, hashing only new or
+        edited patterns; unchanged ones reuse their stored count row.
+        """
+        pattern_texts, pattern_to_tag, tag_to_responses = _parse_intents(data)
+        counts = self._reuse_counts(
+            pattern_texts, _word_hasher(self.counts_t.shape[0]).transform
+        )
+        return HashedIntentIndex._from_counts(
+            pattern_texts, pattern_to_tag, tag_to_responses, counts
+        )
+
+
+def _char_hasher():
+    """Stateless character n-gram hasher: no vocabulary to fit or store."""
+    from sklearn.feature_extraction.text import HashingVectorizer
+
+    return HashingVectorizer(
+        analyzer="char_wb", ngram_range=CHAR_NGRAMS, n_features=CHAR_HASH_FEATURES,
+        alternate_sign=False, norm=None, lowercase=True,
+    )
+
+
+def _l2_normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class DenseIntentIndex(RetrievalIndex):
+    """
+    Character n-gram LSA embeddings searched with one dense matrix product.
+
+    Patterns are hashed into character 2-4-grams (so "how u doin" still
+    shares most of its n-grams with "how you doing"), TF-IDF weighted and
+    projected onto their top singular vectors. Only the hashed columns the
+    catalog uses are kept, so the projection is (used columns x dim) rather
+    than (2**20 x dim). Pattern vectors are a contiguous float32 matrix with
+    L2-normalized rows, so cosine similarity is a single GEMM per batch.
+    """
+
+    CACHE_SUFFIX = "-dense"
+
+    def __init__(self, pattern_texts, pattern_to_tag, tag_to_responses, columns, idf,
+                 projection, vectors):
+        self.columns = columns          # sorted hashed feature ids seen in the catalog
+        self.idf = idf                  # IDF weight per kept column
+        self.projection = projection    # (n_columns x dim) float32
+        self.vectors = vectors          # (n_patterns x dim) float32, unit rows
+        super().__init__(pattern_texts, pattern_to_tag, tag_to_responses)
+
+    @classmethod
+    def build(cls, data):
+        from scipy import sparse
+        from sklearn.preprocessing import normalize
+        from sklearn.utils.extmath import randomized_svd
+
+        pattern_texts, pattern_to_tag, tag_to_responses = _parse_intents(data)
+        hashed = _char_hasher().transform(pattern_texts).tocsc()
+        columns = np.flatnonzero(np.diff(hashed.indptr))
+        counts = hashed[:, columns].tocsr()
+
+        # smoothed IDF, as TfidfTransformer computes it
+        n_patterns = counts.shape[0]
+        df = np.bincount(counts.indices, minlength=len(columns))
+        idf = np.log((1 + n_patterns) / (1 + df)) + 1
+        weighted = normalize(counts @ sparse.diags(idf))
+
+        dim = min(DENSE_DIM, *weighted.shape)
+        _, _, components = randomized_svd(weighted, dim, random_state=0)
+        projection = np.ascontiguousarray(components.T, dtype=np.float32)
+        vectors = np.ascontiguousarray(_l2_normalize(weighted @ projection), dtype=np.float32)
+        return cls(
+            pattern_texts, pattern_to_tag, tag_to_responses,
+            columns, idf.astype(np.float32), projection, vectors,
+        )
+
+    @classmethod
+    def load(cls, cache_dir: Path):
+        with open(cache_dir / "meta.json", "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        arrays = {
+            name: np.load(cache_dir / f"{name}.npy", mmap_mode="r")
+            for name in ("columns", "idf", "projection", "vectors", "pattern_tags")
+        }
+        if (arrays["projection"].shape[0] != len(arrays["columns"])
+                or len(arrays["idf"]) != len(arrays["columns"])
+                or arrays["vectors"].shape[0] != len(arrays["pattern_tags"])):
+            raise ValueError(f"Inconsistent compiled index in {cache_dir}")
+
+        tags = meta["tags"]
+        return cls(
+            meta["patterns"],
+            [tags[i] for i in arrays["pattern_tags"]],
+            meta["responses"],
+            arrays["columns"], arrays["idf"], arrays["projection"], arrays["vectors"],
+        )
+
+    def save(self, cache_dir: Path):
+        tags = list(self.tag_to_responses)
+        tag_codes = {tag: i for i, tag in enumerate(tags)}
+        meta = {"tags": tags, "responses": self.tag_to_responses, "patterns": self.pattern_texts}
+        arrays = {
+            "columns": self.columns,
+            "idf": self.idf,
+            "projection": self.projection,
+            "vectors": self.vectors,
+            "pattern_tags": np.array([tag_codes[t] for t in self.pattern_to_tag], dtype=np.int32),
+        }
+        self._write(cache_dir, arrays, meta)
+
+    def embed(self, texts):
+        """(n_texts x dim) float32 unit vectors; all zeros if no n-gram is known."""
+        from scipy import sparse
+        from sklearn.preprocessing import normalize
+
+        hashed = _char_hasher().transform(texts)
+        # keep only the hashed columns the catalog uses, renumbered
+        pos = np.searchsorted(self.columns, hashed.indices)
+        pos = np.minimum(pos, len(self.columns) - 1)
+        known = self.columns[pos] == hashed.indices
+        row_of = np.repeat(np.arange(len(texts)), np.diff(hashed.indptr))
+        counts = sparse.csr_matrix(
+            (hashed.data[known] * self.idf[pos[known]], (row_of[known], pos[known])),
+            shape=(len(texts), len(self.columns)),
+        )
+        return _l2_normalize(np.asarray(normalize(counts) @ self.projection, dtype=np.float32))
+
+    def similarities(self, texts):
+        with timer("bot.transform"):
+            queries = self.embed(texts)
+        with timer("bot.similarity"):
+            return queries @ self.vectors.T  # shape (n_texts, n_patterns)
+
+
+# retrieval backend name -> index class
+BACKENDS = {"tfidf": IntentIndex, "hashed": HashedIntentIndex, "dense": DenseIntentIndex}
+
+
+class ResponseRotator:
+    """
+    Per-conversation response picker. Each tag's responses are served in a
+    shuffled order, so a reply only comes back once every other reply for
+    that tag was used, and a new round never starts with the reply that
+    ended the last one. Keep one per chat and pass it to answer()/reply().
+    """
+
+    def __init__(self, rng=None):
+        self._rng = rng or random.Random()
+        # tag -> [responses tuple, replies left this round, last reply]
+        self._rounds = {}
+
+    def pick(self, tag, responses):
+        responses = tuple(responses)
+        state = self._rounds.get(tag)
+        if state is None or state[0] != responses:
+            state = self._rounds[tag] = [responses, [], None]
+        if not state[1]:
+            order = list(responses)
+            self._rng.shuffle(order)
+            # replies are popped from the end
+            if len(order) > 1 and order[-1] == state[2]:
+                order[0], order[-1] = order[-1], order[0]
+            state[1] = order
+        state[2] = state[1].pop()
+        return state[2]
+
+    def reset(self):
+        self._rounds.clear()
+
 
 class SimpleRetrievalBot:
-    def __init__(self, intents_path: Path, min_confidence=0.3):
+    def __init__(self, intents_path: Path, min_confidence=0.3, use_index_cache=True,
+                 engine="brute", auto_reload=False, cache_size=1024, backend="tfidf",
+                 cache_ttl=None, reload_interval=1.0):
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown retrieval engine: {engine!r}")
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown retrieval backend: {backend!r}")
         self.intents_path = intents_path
         self.min_confidence = min_confidence
-        self.pattern_texts = []           # list of pattern strings
-        self.pattern_to_tag = []          # parallel list of tags
-        self.tag_to_responses = {}        # map tag -> [responses]
-        self.vectorizer = None
-        self.tfidf = None
+        self.use_index_cache = use_index_cache
+        self.engine = engine
+        self.backend = backend
+        self._index_cls = BACKENDS[backend]
+        # check the intents file (at most every reload_interval seconds)
+        # before a call and hot-swap on change
+        self.auto_reload = auto_reload
+        self.reload_interval = reload_interval
+        self._next_reload_check = 0.0
+        self._index = None                # current RetrievalIndex snapshot
+        self._intents_stat = None         # (mtime_ns, size) of the loaded file
+        self._intents_digest = None       # content hash of the loaded file
+        self._failed_digest = None        # content hash of a file that failed to load
+        self._reload_lock = threading.Lock()
+        # normalized text -> (index, tag, score); the index is stored so a
+        # result computed against a replaced snapshot is never served
+        self._match_cache = LRUCache(cache_size, ttl=cache_ttl)
         self._load_intents()
 
+    # read-only views of the current index snapshot
+    @property
+    def pattern_texts(self):
+        return self._index.pattern_texts
+
+    @property
+    def pattern_to_tag(self):
+        return self._index.pattern_to_tag
+
+    @property
+    def tag_to_responses(self):
+        return self._index.tag_to_responses
+
+    @property
+    def tags(self):
+        return self._index.tags
+
+    @property
+    def vectorizer(self):
+        return self._index.vectorizer
+
+    @property
+    def tfidf(self):
+        return self._index.tfidf
+
     def _load_intents(self):
+        self._intents_stat = self._stat_intents()
+        self._intents_digest = intents_hash(self.intents_path)
+        if not self.use_index_cache:
+            self._index = self._index_cls.build(self._read_intents())
+            return
+
+        cache_dir = self._cache_dir(self._intents_digest)
+        if cache_dir.is_dir():
+            try:
+                self._index = self._index_cls.load(cache_dir)
+                return
+            except (OSError, ValueError, KeyError):
+                # corrupt or partial artifact, fall through to a rebuild
+                pass
+        self._index = self._index_cls.build(self._read_intents())
+        self._index.save(cache_dir)
+
+    def _cache_dir(self, digest):
+        return index_dir_for(self.intents_path) / (digest + self._index_cls.CACHE_SUFFIX)
+
+    def _read_intents(self):
         with open(self.intents_path, 'r') as f:
-            data = json.load(f)
-        for intent in data.get("intents", []):
-            tag = intent["tag"]
-            responses = intent.get("responses", [])
-            patterns = intent.get("patterns", [])
-            self.tag_to_responses[tag] = responses
-            for p in patterns:
-                self.pattern_texts.append(p)
-                self.pattern_to_tag.append(tag)
-        # build TF-IDF index
-        self.vectorizer = TfidfVectorizer(lowercase=True, token_pattern=r"(?u)\b\w+\b")
-        self.tfidf = self.vectorizer.fit_transform(self.pattern_texts)
-    def reply(self, user_text: str):
-        if not user_text.strip():
-            return "Please say something."
-
-        user_vec = self.vectorizer.transform([user_text])
-        sims = cosine_similarity(user_vec, self.tfidf)[0]  # shape (n_patterns,)
-        best_idx = int(sims.argmax())
-        best_score = float(sims[best_idx])
-        best_tag = self.pattern_to_tag[best_idx]
-
-        if best_score < self.min_confidence:
+            return json.load(f)
+
+    def _stat_intents(self):
+        st = os.stat(self.intents_path)
+        return st.st_mtime_ns, st.st_size
+
+    def reload_if_changed(self):
+        """
+        Re-read the intents file if it changed on disk and swap in a new index.
+
+        The cheap mtime/size check runs first, then the content hash. Returns
+        the {"added", "removed", "changed"} tag diff, or None if nothing changed.
+        A file that cannot be read or built (e.g. a half-saved edit) is
+        logged and the current index keeps serving; that content is not
+        retried until the file changes again.
+        """
+        with self._reload_lock:
+            old_index = self._index
+            digest = None
+            try:
+                stat = self._stat_intents()
+                if stat == self._intents_stat:
+                    return None
+                digest = intents_hash(self.intents_path)
+                if digest in (self._intents_digest, self._failed_digest):
+                    self._intents_stat = stat
+                    return None
+                new_data = self._read_intents()
+                index = old_index.updated(new_data)
+            except (OSError, ValueError, KeyError, TypeError) as exc:
+                logger.error("Keeping the loaded intents, reloading %s failed: %s",
+                             self.intents_path, exc)
+                if digest is not None:
+                    self._failed_digest = digest
+                    self._intents_stat = stat
+                return None
+
+            if self.use_index_cache:
+                index.save(self._cache_dir(digest))
+
+            # single reference assignment: readers see the old or the new index
+            self._index = index
+            self._match_cache.clear()
+            self._intents_stat = stat
+            self._intents_digest = digest
+            return diff_intents(old_index.to_intents(), new_data)
+
+    def _current_index(self):
+        if self.auto_reload:
+            now = time.monotonic()
+            if now >= self._next_reload_check:
+                self._next_reload_check = now + self.reload_interval
+                # the lock is only taken once the file looks different
+                try:
+                    changed = self._stat_intents() != self._intents_stat
+                except OSError:
+                    changed = False  # e.g. mid-rename; checked again next interval
+                if changed:
+                    self.reload_if_changed()
+        return self._index
+
+    def cache_info(self):
+        """Hit/miss/expiry counters, hit rate and size of the match cache."""
+        return self._match_cache.info()
+
+    def _classify(self, index, texts):
+        # the vectorizer lowercases and splits on word boundaries, so this
+        # key maps every spelling variant to the same match
+        keys = [normalize_text(t).lower() for t in texts]
+        results = [None] * len(texts)
+        misses = []
+        for i, key in enumerate(keys):
+            cached = self._match_cache.get(key)
+            if cached is not None and cached[0] is index:
+                results[i] = cached[1:]
+            else:
+                misses.append(i)
+
+        if self.engine == "inverted" and isinstance(index, IntentIndex):
+            rows = CANDIDATE_CHUNK_SIZE
+        else:
+            rows = _chunk_rows(len(index.pattern_to_tag))
+        for start in range(0, len(misses), rows):
+            positions = misses[start:start + rows]
+            chunk = [texts[i] for i in positions]
+            if self.engine == "inverted":
+                best_idx, best_scores = index.best_candidates(chunk)
+            else:
+                sims = index.similarities(chunk)
+                best_idx = sims.argmax(axis=1)
+                best_scores = sims[range(len(chunk)), best_idx]
+            for i, idx, score in zip(positions, best_idx, best_scores):
+                results[i] = (index.pattern_to_tag[int(idx)], float(score))
+                self._match_cache.put(keys[i], (index,) + results[i])
+        return results
+
+    def classify_batch(self, texts):
+        """
+        Return a (tag, score) pair for every text, using one vectorizer call
+        and one sparse product per chunk instead of one per message.
+        """
+        return self._classify(self._current_index(), list(texts))
+
+    def rank_batch(self, texts, k=3, agg="max"):
+        """
+        Return the top-k intents for every text as [(tag, score), ...],
+        best first. Pattern scores are aggregated per tag with "max" or "mean".
+        """
+        if agg not in ("max", "mean"):
+            raise ValueError(f"Unknown aggregation: {agg!r}")
+        index = self._current_index()
+        texts = list(texts)
+        n_tags = len(index.tags)
+        k = min(k, n_tags)
+        results = []
+        if k <= 0:
+            return [[] for _ in texts]
+
+        rows = _chunk_rows(len(index.pattern_to_tag))
+        for start in range(0, len(texts), rows):
+            chunk = texts[start:start + rows]
+            sims = index.similarities(chunk)
+            if agg == "max":
+                grouped = sims if index.tag_order is None else sims[:, index.tag_order]
+                tag_scores = np.maximum.reduceat(grouped, index.tag_starts, axis=1)
+            else:
+                tag_scores = np.asarray(sims @ index.tag_indicator) / index.tag_counts
+
+            # partial selection of the k best, then sort only those k
+            if k < n_tags:
+                top = np.argpartition(-tag_scores, k - 1, axis=1)[:, :k]
+            else:
+                top = np.tile(np.arange(n_tags), (len(chunk), 1))
+            top_scores = np.take_along_axis(tag_scores, top, axis=1)
+            order = np.argsort(-top_scores, axis=1, kind="stable")
+            top = np.take_along_axis(top, order, axis=1)
+            top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+            for row_tags, row_scores in zip(top, top_scores):
+                results.append(
+                    [(index.tags[int(t)], float(s)) for t, s in zip(row_tags, row_scores)]
+                )
+        return results
+
+    def rank(self, user_text: str, k=3, agg="max"):
+        return self.rank_batch([user_text], k=k, agg=agg)[0]
+
+    @timed("bot.reply")
+    def answer_batch(self, texts, rotator=None):
+        """
+        Return (reply, tag, score) for every text. tag is None when the
+        message was empty or the fallback reply was used. With a
+        ResponseRotator, replies are picked without repeats instead of at
+        random.
+        """
+        index = self._current_index()
+        texts = list(texts)
+        answers = [(EMPTY_INPUT_RESPONSE, None, 0.0)] * len(texts)
+        positions = [i for i, t in enumerate(texts) if t.strip()]
+        matches = self._classify(index, [texts[i] for i in positions])
+
+        with timer("bot.select_response"):
+            for i, (tag, score) in zip(positions, matches):
+                matched = tag if score >= self.min_confidence else None
+                answers[i] = (self._pick_response(index, tag, score, rotator), matched, score)
+        return answers
+
+    def reply_batch(self, texts, rotator=None):
+        return [reply for reply, _, _ in self.answer_batch(texts, rotator)]
+
+    def _pick_response(self, index, tag, score, rotator=None):
+        if score < self.min_confidence:
             # fallback reply
-            return random.choice([
-                "Sorry, I didn't understand. Could you rephrase?",
-                "I'm not sure I follow — can you tell me more?"
-            ])
-        return random.choice(self.tag_to_responses.get(best_tag, ["Sorry."]))
+            tag, responses = None, FALLBACK_RESPONSES
+        else:
+            responses = index.tag_to_responses.get(tag, ["Sorry."])
+        if rotator is None:
+            return random.choice(responses)
+        return rotator.pick(tag, responses)
+
+    def answer(self, user_text: str, rotator=None):
+        return self.answer_batch([user_text], rotator)[0]
+
+    def reply(self, user_text: str, rotator=None):
+        return self.reply_batch([user_text], rotator)[0]
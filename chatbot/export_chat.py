@@ -1,28 +1,77 @@
+import csv
+import io
+import json
 from pathlib import Path
 from datetime import datetime
 
-def export_chat(history, filename=None):
+from chatbot.metrics import timed
+
+# format -> (file extension, MIME type)
+EXPORT_FORMATS = {
+    "text": ("txt", "text/plain"),
+    "jsonl": ("jsonl", "application/x-ndjson"),
+    "csv": ("csv", "text/csv"),
+}
+CSV_COLUMNS = ("User_text", "label", "score", "Bot_reply")
+
+
+def _iter_text(history):
+    yield "=== Chat Transcript ===\n\n"
+    for turn in history:
+        yield (
+            f"User: {turn['User_text']}\n"
+            f"Sentiment: {turn['label']} (compound={turn['score']})\n"
+            f"Bot: {turn['Bot_reply']}\n"
+            + "-" * 40 + "\n"
+        )
+
+
+def _iter_jsonl(history):
+    for turn in history:
+        yield json.dumps({k: turn[k] for k in CSV_COLUMNS}, ensure_ascii=False) + "\n"
+
+
+def _iter_csv(history):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+    for turn in history:
+        writer.writerow([turn[k] for k in CSV_COLUMNS])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    # header only, for an empty chat
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+_EXPORTERS = {"text": _iter_text, "jsonl": _iter_jsonl, "csv": _iter_csv}
+
+
+def iter_export(history, fmt="text"):
+    """
+    Yield the transcript of `history` (any iterable of turns) chunk by chunk,
+    one turn per chunk, so nothing larger than a turn is held in memory.
+    """
+    if fmt not in _EXPORTERS:
+        raise ValueError(f"Unknown export format: {fmt!r}")
+    return _EXPORTERS[fmt](history)
+
+
+@timed("export.export_chat")
+def export_chat(history, filename=None, fmt="text"):
     """
-    Export the chat history to a text file in a clean, readable format.
+    Export the chat history to a file in a clean, readable format.
     """
 
     export_dir =  Path("data")
     if filename is None:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = export_dir/f"chat_export_{timestamp}.txt"
-
-    with open(filename, "w", encoding="utf-8") as f:
-        f.write("=== Chat Transcript ===\n\n")
-
-        for turn in history:
-            user_msg = turn["User_text"]
-            bot_msg = turn["Bot_reply"]
-            sentiment = turn["label"]
-            score = turn["score"]
+        extension = EXPORT_FORMATS[fmt][0]
+        filename = export_dir/f"chat_export_{timestamp}.{extension}"
 
-            f.write(f"User: {user_msg}\n")
-            f.write(f"Sentiment: {sentiment} (compound={score})\n")
-            f.write(f"Bot: {bot_msg}\n")
-            f.write("-" * 40 + "\n")
+    with open(filename, "w", encoding="utf-8", newline="") as f:
+        for chunk in iter_export(history, fmt):
+            f.write(chunk)
 
     print(f"Chat exported successfully: {filename}")
@@ -1,5 +1,319 @@
 import json
+import os
+from array import array
+from datetime import datetime
 
-def save_history(history, filename="history.json"):
-    with open(filename, "w") as f:
-        json.dump(history, f, indent=4)
+import numpy as np
+
+from chatbot.analytics import LABELS
+from chatbot.metrics import timed
+
+FSYNC_POLICIES = ("always", "never")
+NO_TAG = -1
+
+
+class ConversationLog:
+    """
+    Append-only JSON Lines store with one conversation per line.
+
+    Each save is a single buffered write to the end of the file, so earlier
+    conversations are never rewritten. A sidecar ``<path>.idx`` holds the
+    (offset, length) of every line, which lets read_conversation() seek
+    straight to one conversation without parsing the rest of the file.
+
+    fsync is "always" (fsync after every append), "never" (leave it to the
+    OS) or an integer N (fsync every N appends). One writer per file.
+    """
+
+    def __init__(self, path="history.jsonl", fsync="always"):
+        if fsync not in FSYNC_POLICIES and not (isinstance(fsync, int) and fsync > 0):
+            raise ValueError(f"Unknown fsync policy: {fsync!r}")
+        self.path = str(path)
+        self.index_path = self.path + ".idx"
+        self.fsync = fsync
+        self._unsynced = 0
+        self._count = 0
+        self._offsets = None  # offset, length pairs, read on the first lookup
+        self._recover()
+
+    def _recover(self):
+        """
+        Drop a torn trailing line and bring the offset index up to date.
+
+        When the index is whole and its last entry ends where the data file
+        does, that entry is all that is read, so opening a log costs the same
+        however many conversations it holds.
+        """
+        if not os.path.exists(self.path):
+            open(self.path, "ab").close()
+        size = os.path.getsize(self.path)
+
+        index_size = os.path.getsize(self.index_path) if os.path.exists(self.index_path) else 0
+        if index_size % 16 == 0:
+            last = array("q", (0, 0))
+            if index_size:
+                with open(self.index_path, "rb") as f:
+                    f.seek(index_size - 16)
+                    last = array("q", f.read(16))
+            if sum(last) == size:
+                self._count = index_size // 16
+                return
+
+        self._offsets = array("q")
+        raw = b""
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "rb") as f:
+                raw = f.read()
+            self._offsets.frombytes(raw[:len(raw) - len(raw) % 16])  # skip a torn entry
+            # keep only entries that lie fully inside the data file
+            while len(self._offsets) and sum(self._offsets[-2:]) > size:
+                del self._offsets[-2:]
+
+        end = sum(self._offsets[-2:]) if len(self._offsets) else 0
+        with open(self.path, "rb") as f:
+            f.seek(end)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # partial write from a crash
+                self._offsets.extend((end, len(line)))
+                end += len(line)
+
+        if end != size:
+            with open(self.path, "r+b") as f:
+                f.truncate(end)
+        if self._offsets.tobytes() != raw:
+            with open(self.index_path, "wb") as f:
+                self._offsets.tofile(f)
+        self._count = len(self._offsets) // 2
+
+    def _entries(self):
+        if self._offsets is None:
+            self._offsets = array("q")
+            with open(self.index_path, "rb") as f:
+                self._offsets.fromfile(f, 2 * self._count)
+        return self._offsets
+
+    def __len__(self):
+        return self._count
+
+    @timed("history.append")
+    def append_conversation(self, history, **meta):
+        """Append one conversation and return its id (its position in the log)."""
+        conversation_id = len(self)
+        record = {
+            "id": conversation_id,
+            "saved_at": datetime.now().isoformat(timespec="seconds"),
+            **meta,
+            "turns": list(history),
+        }
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+
+        with open(self.path, "ab") as f:
+            offset = f.tell()
+            f.write(line)
+            f.flush()
+            self._maybe_fsync(f)
+        if self._offsets is not None:
+            self._offsets.extend((offset, len(line)))
+        self._count += 1
+        with open(self.index_path, "ab") as f:
+            array("q", (offset, len(line))).tofile(f)
+        return conversation_id
+
+    def _maybe_fsync(self, f):
+        if self.fsync == "never":
+            return
+        self._unsynced += 1
+        if self.fsync == "always" or self._unsynced >= self.fsync:
+            os.fsync(f.fileno())
+            self._unsynced = 0
+
+    def read_conversation(self, conversation_id):
+        if not 0 <= conversation_id < len(self):
+            raise IndexError(f"No conversation {conversation_id} in {self.path}")
+        offset, length = self._entries()[2 * conversation_id:2 * conversation_id + 2]
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            return json.loads(f.read(length))
+
+    def iter_conversations(self):
+        """Stream every stored conversation, oldest first."""
+        with open(self.path, "rb") as f:
+            for line in f:
+                yield json.loads(line)
+
+
+def _grown(array_, needed):
+    """array_ itself if it holds `needed` items, else a copy with doubled capacity."""
+    if needed <= len(array_):
+        return array_
+    bigger = np.empty(max(needed, 2 * len(array_), 16), dtype=array_.dtype)
+    bigger[:len(array_)] = array_
+    return bigger
+
+
+class ConversationHistory:
+    """
+    Turns of one conversation stored column-wise instead of one dict each.
+
+    Labels and tags are interned into small integer codes (label codes match
+    chatbot.analytics, tag -1 means no tag), scores are float32 and both texts
+    of every turn share one UTF-8 buffer indexed by offsets. Columns grow by
+    doubling, so append is amortised O(1).
+
+    It behaves like the list of turn dicts the app used to keep: append(),
+    len(), indexing and iteration accept and return dicts with the keys
+    User_text, Bot_reply, label, score and (when set) tag. Those dicts are
+    built on access; changing one does not change the history.
+
+    scores, label_codes and tag_codes are NumPy views of the columns, and
+    to_frame() wraps scores and label codes in a DataFrame without copying them.
+    A view keeps showing the turns that existed when it was taken.
+    """
+
+    def __init__(self, turns=()):
+        self._n = 0
+        self._scores = np.empty(0, dtype=np.float32)
+        self._labels = np.empty(0, dtype=np.int8)
+        self._tags = np.empty(0, dtype=np.int16)
+        self._text = bytearray()
+        # turn i: User_text is text[offsets[2i]:offsets[2i+1]], Bot_reply the next slice
+        self._offsets = np.zeros(1, dtype=np.int64)
+        self.label_names = list(LABELS)
+        self.tag_names = []
+        self._label_codes = {label: code for code, label in enumerate(LABELS)}
+        self._tag_codes = {}
+        self.extend(turns)
+
+    @staticmethod
+    def _intern(value, codes, names):
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(names)
+            names.append(value)
+        return code
+
+    def append(self, turn):
+        n = self._n
+        user = turn["User_text"].encode("utf-8")
+        bot = turn["Bot_reply"].encode("utf-8")
+        tag = turn.get("tag")
+
+        self._scores = _grown(self._scores, n + 1)
+        self._labels = _grown(self._labels, n + 1)
+        self._tags = _grown(self._tags, n + 1)
+        self._offsets = _grown(self._offsets, 2 * n + 3)
+        end = len(self._text)
+
+        self._scores[n] = turn["score"]
+        self._labels[n] = self._intern(turn["label"], self._label_codes, self.label_names)
+        self._tags[n] = NO_TAG if tag is None else self._intern(tag, self._tag_codes, self.tag_names)
+        self._text += user
+        self._text += bot
+        self._offsets[2 * n + 1] = end + len(user)
+        self._offsets[2 * n + 2] = end + len(user) + len(bot)
+        self._n = n + 1
+
+    def extend(self, turns):
+        for turn in turns:
+            self.append(turn)
+
+    def __len__(self):
+        return self._n
+
+    def _decode(self, k):
+        return self._text[self._offsets[k]:self._offsets[k + 1]].decode("utf-8")
+
+    def _turn(self, i):
+        turn = {
+            "User_text": self._decode(2 * i),
+            "Bot_reply": self._decode(2 * i + 1),
+            "label": self.label_names[self._labels[i]],
+            # shortest decimal that rounds to the stored float32, so 0.4404
+            # comes back as 0.4404 rather than 0.44040000438690186
+            "score": float(str(self._scores[i])),
+        }
+        if self._tags[i] != NO_TAG:
+            turn["tag"] = self.tag_names[self._tags[i]]
+        return turn
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._turn(j) for j in range(*i.indices(self._n))]
+        if i < 0:
+            i += self._n
+        if not 0 <= i < self._n:
+            raise IndexError("turn index out of range")
+        return self._turn(i)
+
+    def __iter__(self):
+        for i in range(self._n):
+            yield self._turn(i)
+
+    def __repr__(self):
+        return f"ConversationHistory({self._n} turns)"
+
+    # ---------- column views ----------
+
+    @property
+    def scores(self):
+        return self._scores[:self._n]
+
+    @property
+    def label_codes(self):
+        return self._labels[:self._n]
+
+    @property
+    def tag_codes(self):
+        return self._tags[:self._n]
+
+    def texts(self, field="User_text"):
+        """Decoded User_text or Bot_reply of every turn."""
+        first = {"User_text": 0, "Bot_reply": 1}[field]
+        return [self._decode(2 * i + first) for i in range(self._n)]
+
+    def to_frame(self, texts=False):
+        """
+        DataFrame with score, label and tag columns, labels and tags as
+        categoricals. The score column and the label categorical's codes
+        (frame["label"].array) share memory with the history, but
+        .cat.codes builds a new Series, i.e. a copy. Tag codes are narrowed
+        (copied) by pandas for catalogs under 128 tags. texts=True adds the
+        two text columns, decoded and therefore copied.
+        """
+        import pandas as pd
+
+        columns = {
+            "score": self.scores,
+            "label": pd.Categorical.from_codes(self.label_codes, self.label_names, validate=False),
+            "tag": pd.Categorical.from_codes(self.tag_codes, self.tag_names, validate=False),
+        }
+        if texts:
+            columns["User_text"] = self.texts("User_text")
+            columns["Bot_reply"] = self.texts("Bot_reply")
+        return pd.DataFrame(columns, copy=False)
+
+    def nbytes(self):
+        """Bytes used by the columns of the stored turns (excluding spare capacity)."""
+        n = self._n
+        return (
+            self.scores.nbytes + self.label_codes.nbytes + self.tag_codes.nbytes
+            + int(self._offsets[2 * n]) + self._offsets[:2 * n + 1].nbytes
+        )
+
+
+def load_legacy_history(filename="history.json"):
+    """Read the old format: one JSON list of turns, rewritten on every save."""
+    with open(filename, "r") as f:
+        return json.load(f)
+
+
+def migrate_legacy_history(json_path="history.json", log_path="history.jsonl"):
+    """Append the turns of an old history.json to the log as one conversation."""
+    log = ConversationLog(log_path)
+    return log.append_conversation(load_legacy_history(json_path), migrated_from=str(json_path))
+
+
+@timed("history.save")
+def save_history(history, filename="history.jsonl", **meta):
+    return ConversationLog(filename).append_conversation(history, **meta)
@@ -0,0 +1,162 @@
+"""
+Read chat_export_*.txt transcripts (as written by export_chat) back into turns.
+
+    python -m chatbot.import_chat data/ --db chats.db
+"""
+import argparse
+import os
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from chatbot.sentiment import RunningSummary
+from chatbot.storage import DEFAULT_DB_PATH, ChatStore
+
+HEADER = "=== Chat Transcript ==="
+SEPARATOR = "-" * 40
+SENTIMENT_RE = re.compile(r"^Sentiment: (Positive|Negative|Neutral) \(compound=([^)]*)\)$")
+FILENAME_RE = re.compile(r"chat_export_(\d{8}_\d{6})")
+# imported chats are stored under this session id; the History and Analysis
+# pages offer it next to the current browser session
+IMPORT_SESSION_ID = "import"
+
+
+class TranscriptParseError(ValueError):
+    def __init__(self, path, lineno, message):
+        super().__init__(f"{path}:{lineno}: {message}")
+        self.path = str(path)
+        self.lineno = lineno
+        self.message = message
+
+
+def parse_transcript(path):
+    """
+    Yield turns ({"User_text", "Bot_reply", "label", "score"}) from a
+    transcript, reading it line by line. Lines that belong to no field are
+    continuation lines of a multi-line user message or bot reply.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        turn = None
+        field = None  # field that continuation lines are appended to
+        lineno = 0
+        for lineno, raw in enumerate(f, start=1):
+            line = raw.rstrip("\n")
+
+            if lineno == 1:
+                if line != HEADER:
+                    raise TranscriptParseError(path, lineno, f"expected {HEADER!r}")
+                continue
+
+            if line == SEPARATOR and field == "Bot_reply":
+                yield turn
+                turn, field = None, None
+            elif line.startswith("User: ") and field in (None, "Bot_reply"):
+                if turn is not None:
+                    raise TranscriptParseError(path, lineno, "missing separator before 'User:'")
+                turn, field = {"User_text": line[len("User: "):]}, "User_text"
+            elif line.startswith("Sentiment: ") and field == "User_text":
+                match = SENTIMENT_RE.match(line)
+                if match is None:
+                    raise TranscriptParseError(path, lineno, "malformed sentiment line")
+                try:
+                    score = float(match.group(2))
+                except ValueError:
+                    raise TranscriptParseError(path, lineno, "compound score is not a number")
+                turn["label"], turn["score"] = match.group(1), score
+                field = "Sentiment"
+            elif line.startswith("Bot: ") and field == "Sentiment":
+                turn["Bot_reply"], field = line[len("Bot: "):], "Bot_reply"
+            elif field in ("User_text", "Bot_reply"):
+                turn[field] += "\n" + line
+            elif field is None and not line:
+                continue  # blank line after the header
+            else:
+                raise TranscriptParseError(path, lineno, f"unexpected line {line[:40]!r}")
+
+        if turn is not None:
+            raise TranscriptParseError(path, lineno, "transcript ends in the middle of a turn")
+
+
+def _parse_file(path):
+    try:
+        return path, list(parse_transcript(path)), None
+    except (TranscriptParseError, UnicodeDecodeError) as exc:
+        return path, None, str(exc)
+    except OSError as exc:
+        # unreadable file, or a directory that matched the pattern
+        return path, None, f"{path}: {exc.strerror or exc}"
+
+
+def _parse_files(paths, workers):
+    """
+    Yield _parse_file results in order. At most 2 x workers files are parsed
+    ahead of the consumer, so a slow store never lets parsed transcripts
+    pile up in memory (like score_many's read-ahead).
+    """
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for path in paths:
+            pending.append(pool.submit(_parse_file, path))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _exported_at(path):
+    match = FILENAME_RE.search(Path(path).name)
+    if match is None:
+        return None
+    try:
+        return datetime.strptime(match.group(1), "%Y%m%d_%H%M%S").isoformat()
+    except ValueError:
+        return None
+
+
+def import_transcripts(directory, store, pattern="chat_export_*.txt", workers=None,
+                       session_id=IMPORT_SESSION_ID):
+    """
+    Parse every transcript in `directory` in a process pool and save each one
+    to `store` (a ChatStore) with its overall sentiment and mood trend.
+
+    Returns (number imported, list of "file:line: message" errors); a bad file
+    is reported and skipped rather than aborting the import.
+    """
+    paths = sorted(str(p) for p in Path(directory).glob(pattern))
+    workers = workers or os.cpu_count() or 1
+    imported = 0
+    errors = []
+
+    for path, turns, error in _parse_files(paths, workers):
+        if error is not None:
+            errors.append(error)
+            continue
+        summary = RunningSummary.from_history(turns)
+        store.save_conversation(
+            turns,
+            overall=summary.overall_label(),
+            trend=summary.trend(),
+            session_id=session_id,
+            created_at=_exported_at(path),
+        )
+        imported += 1
+    return imported, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import chat_export_*.txt transcripts.")
+    parser.add_argument("directory", nargs="?", default="data")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    imported, errors = import_transcripts(args.directory, ChatStore(args.db), workers=args.workers)
+    for error in errors:
+        print(f"skipped {error}")
+    print(f"Imported {imported} transcripts into {args.db}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+Per-stage latency histograms for the hot paths.
+
+Disabled by default; turn on with CHATBOT_METRICS=1 or metrics.enable().
+While disabled, timer() returns a shared no-op context manager and @timed
+functions only pay one flag check, so instrumentation can stay in place.
+
+    with timer("bot.similarity"):
+        ...
+
+    @timed("history.save")
+    def save_history(...): ...
+
+Read the numbers with snapshot() or prometheus_text().
+"""
+import functools
+import math
+import os
+import threading
+from bisect import bisect_left
+from time import perf_counter
+
+# upper bounds in seconds, Prometheus-style (cumulative on export)
+BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, math.inf,
+)
+METRIC_NAME = "chatbot_stage_seconds"
+
+_enabled = os.environ.get("CHATBOT_METRICS", "") not in ("", "0")
+_histograms = {}
+_lock = threading.Lock()
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        i = bisect_left(BUCKETS, seconds)
+        with self._lock:
+            self.counts[i] += 1
+            self.count += 1
+            self.total += seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th quantile (capped at max)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(BUCKETS, self.counts):
+            seen += n
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def observe(name, seconds):
+    hist = _histograms.get(name)
+    if hist is None:
+        with _lock:
+            hist = _histograms.setdefault(name, Histogram())
+    hist.observe(seconds)
+
+
+class _Timer:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, perf_counter() - self.start)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def timer(name):
+    """Context manager recording the time spent in its block under `name`."""
+    if not _enabled:
+        return _NULL_TIMER
+    return _Timer(name)
+
+
+def timed(name):
+    """Decorator recording every call of the function under `name`."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                observe(name, perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+
+
+def snapshot():
+    """
+    {stage: {"count", "sum", "mean", "max", "p50", "p99"}} in seconds.
+    Quantiles are bucket upper bounds, so they over-estimate by at most
+    one bucket.
+    """
+    with _lock:
+        items = sorted(_histograms.items())
+    result = {}
+    for name, hist in items:
+        with hist._lock:
+            result[name] = {
+                "count": hist.count,
+                "sum": hist.total,
+                "mean": hist.total / hist.count if hist.count else 0.0,
+                "max": hist.max,
+                "p50": hist.quantile(0.5),
+                "p99": hist.quantile(0.99),
+            }
+    return result
+
+
+def prometheus_text():
+    """All histograms in the Prometheus text exposition format."""
+    lines = [
+        f"# HELP {METRIC_NAME} Time spent per processing stage.",
+        f"# TYPE {METRIC_NAME} histogram",
+    ]
+    with _lock:
+        items = sorted(_histograms.items())
+    for name, hist in items:
+        with hist._lock:
+            counts, count, total = list(hist.counts), hist.count, hist.total
+        cumulative = 0
+        for bound, n in zip(BUCKETS, counts):
+            cumulative += n
+            le = "+Inf" if math.isinf(bound) else repr(bound)
+            lines.append(f'{METRIC_NAME}_bucket{{stage="{name}",le="{le}"}} {cumulative}')
+        lines.append(f'{METRIC_NAME}_sum{{stage="{name}"}} {total}')
+        lines.append(f'{METRIC_NAME}_count{{stage="{name}"}} {count}')
+    return "\n".join(lines) + "\n"
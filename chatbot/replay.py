@@ -0,0 +1,100 @@
+"""
+Headless batch inference: intent + sentiment for every message of a log.
+"""
+import json
+import sys
+import time
+from itertools import islice, tee
+
+from chatbot.sentiment import score_many
+
+INPUT_FORMATS = ("lines", "jsonl")
+
+
+def read_messages(stream, fmt="lines", text_key="text", on_error=None):
+    """
+    Yield message texts from a file object, one per line or per JSON object.
+
+    A JSONL line that is not a JSON object with a string text_key is
+    skipped, after calling on_error(line_number, reason) if given.
+    """
+    if fmt not in INPUT_FORMATS:
+        raise ValueError(f"Unknown input format: {fmt!r}")
+    for line_number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        if fmt != "jsonl":
+            yield line.rstrip("\r\n")
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            reason = f"invalid JSON ({exc})"
+        else:
+            text = record.get(text_key) if isinstance(record, dict) else None
+            if isinstance(text, str):
+                yield text
+                continue
+            reason = f"no string {text_key!r} field"
+        if on_error is not None:
+            on_error(line_number, reason)
+
+
+def replay(messages, bot, batch_size=512, workers=1):
+    """
+    Yield one result dict per message, in input order.
+
+    Messages are pulled batch_size at a time for one rank_batch call on the
+    bot (its top entry is the best intent), while sentiment runs as a single score_many stream over
+    the same messages (so a worker pool is started once, not per batch).
+    Memory is bounded by the batch and score_many's read-ahead, not the log.
+    confidence is the margin between the best and the runner-up intent
+    (1.0 if there is no runner-up).
+    """
+    messages, sentiment_input = tee(messages)
+    sentiments = score_many(sentiment_input, workers=workers)
+    while True:
+        batch = list(islice(messages, batch_size))
+        if not batch:
+            return
+        ranked = bot.rank_batch(batch, k=2)
+
+        for text, top, (label, compound) in zip(batch, ranked, sentiments):
+            tag, score = top[0] if top else (None, 0.0)
+            confidence = top[0][1] - top[1][1] if len(top) > 1 else 1.0
+            yield {
+                "text": text,
+                "tag": tag,
+                "score": round(score, 6),
+                "confidence": round(confidence, 6),
+                "label": label,
+                "compound": compound,
+            }
+
+
+def run_replay(bot, input_stream, output_stream, fmt="lines", batch_size=512,
+               workers=1, report=sys.stderr):
+    """
+    Stream JSONL results for every message to output_stream and report
+    throughput. Unreadable input lines are reported and skipped, not fatal.
+    """
+    start = time.perf_counter()
+    count = 0
+    skipped = 0
+
+    def skip(line_number, reason):
+        nonlocal skipped
+        skipped += 1
+        if report is not None:
+            print(f"Skipping line {line_number}: {reason}", file=report)
+
+    messages = read_messages(input_stream, fmt, on_error=skip)
+    for record in replay(messages, bot, batch_size, workers):
+        output_stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+        count += 1
+    elapsed = time.perf_counter() - start
+    if report is not None:
+        rate = count / elapsed if elapsed > 0 else 0.0
+        print(f"Processed {count} messages in {elapsed:.2f}s ({rate:.0f} msg/s), "
+              f"skipped {skipped} lines", file=report)
+    return count
@@ -1,9 +1,52 @@
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
 
-sia = SentimentIntensityAnalyzer()
+from chatbot.cache import LRUCache, normalize_text
+from chatbot.metrics import timed
 
+# the one VADER analyzer of the process, built on first use: loading the
+# lexicon is the expensive part and pages that only summarize never need it
+_analyzer = None
+_analyzer_lock = threading.Lock()
+
+# short repeated messages ("hi", "ok bye", "thanks") dominate traffic, so
+# scores are memoized on whitespace-normalized text
+SENTIMENT_CACHE_SIZE = 4096
+_sentiment_cache = LRUCache(SENTIMENT_CACHE_SIZE)
+
+# score_many stays serial below this many messages, where pool start-up
+# costs more than it saves
+SERIAL_THRESHOLD = 2000
+
+
+def get_analyzer():
+    global _analyzer
+    if _analyzer is None:
+        with _analyzer_lock:
+            if _analyzer is None:
+                from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+                _analyzer = SentimentIntensityAnalyzer()
+    return _analyzer
+
+
+def __getattr__(name):
+    # `from chatbot.sentiment import sia` keeps working, without an eager load
+    if name == "sia":
+        return get_analyzer()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+@timed("sentiment.score")
 def get_sentiment_label_and_score(text: str):
-    s = sia.polarity_scores(text)
+    key = normalize_text(text)
+    cached = _sentiment_cache.get(key)
+    if cached is not None:
+        return cached
+
+    s = get_analyzer().polarity_scores(key)
     compound = s["compound"]
     if compound >= 0.05:
         label = "Positive"
@@ -11,9 +54,62 @@ def get_sentiment_label_and_score(text: str):
         label = "Negative"
     else:
         label = "Neutral"
+    _sentiment_cache.put(key, (label, compound))
     return label, compound
 
 
+def sentiment_cache_info():
+    """Hit/miss counters and size of the sentiment cache."""
+    return _sentiment_cache.info()
+
+
+def set_sentiment_cache_size(maxsize: int):
+    """Change the cache bound, evicting least recently used entries; 0 disables it."""
+    _sentiment_cache.resize(maxsize)
+
+
+def clear_sentiment_cache():
+    _sentiment_cache.clear()
+
+
+def _score_chunk(chunk):
+    return [get_sentiment_label_and_score(text) for text in chunk]
+
+
+def _chunks(iterable, size):
+    it = iter(iterable)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def score_many(texts, workers=1, chunksize=1000):
+    """
+    Yield (label, compound) for every text, in input order.
+
+    With workers > 1, chunks of `chunksize` messages are scored in a process
+    pool. Input is consumed lazily and at most 2 * workers chunks are in
+    flight, so memory stays flat however long the input is.
+    """
+    texts = iter(texts)
+    head = list(islice(texts, SERIAL_THRESHOLD))
+    if workers <= 1 or len(head) < SERIAL_THRESHOLD:
+        for text in chain(head, texts):
+            yield get_sentiment_label_and_score(text)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for chunk in _chunks(chain(head, texts), chunksize):
+            pending.append(pool.submit(_score_chunk, chunk))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
 def score_to_label(score: float) -> str:
     if score >= 0.05:
         return "Positive"
@@ -23,6 +119,7 @@ def score_to_label(score: float) -> str:
         return "Neutral"
 
 
+@timed("sentiment.trend")
 def analyze_trend(history_scores):
     if len(history_scores) < 2:
         return "Not enough data to determine mood trend."
@@ -30,16 +127,17 @@ def analyze_trend(history_scores):
     # Convert scores → labels
     labels = [score_to_label(s) for s in history_scores]
 
-    start = labels[0]
-    end = labels[-1]
-
     # Count transitions (e.g., Positive→Neutral→Negative)
     transitions = sum(
         1 for i in range(1, len(labels)) if labels[i] != labels[i - 1]
     )
 
-    # --- 1. Completely constant tone (already handled but improved) ---
-    if len(set(labels)) == 1:
+    return _describe_trend(labels[0], labels[-1], labels[len(labels) // 2], transitions)
+
+
+def _describe_trend(start, end, mid_label, transitions):
+    # --- 1. Completely constant tone (no label ever changed) ---
+    if transitions == 0:
         return f"Tone remained consistently {start.lower()} throughout the conversation."
 
     # --- 2. Clear improvement (Negative → Neutral/Positive) ---
@@ -65,8 +163,6 @@ def analyze_trend(history_scores):
         return f"Tone shifted from {start.lower()} to {end.lower()}."
 
     # --- 6. Two-phase conversation (start → mid → end) ---
-    mid_label = labels[len(labels) // 2]
-
     if start != mid_label or mid_label != end:
         return (
             f"Conversation started {start.lower()}, "
@@ -78,22 +174,20 @@ def analyze_trend(history_scores):
     return "Mood trend shows mixed shifts over time."
 
 
+@timed("sentiment.summarize")
 def summarize_conversation(history):
+    # weighted sentiment: every score is weighted by its strength, so strong
+    # emotions count more. Computed by RunningSummary so the batch and the
+    # incremental summaries add the same floats in the same order.
+    return RunningSummary.from_history(history).overall()
 
-    scores = [h["score"] for h in history]
-    if not scores:
-        return "Neutral", "no messages to analyze."
-
-    # weights based on strength of each message
-    weights = [abs(s) for s in scores]
-    total_weight = sum(weights)
 
+def _overall_label(total_weight, weighted_sum):
     if total_weight == 0:
         # all scores are 0 → perfectly neutral chat
         return "Neutral", "conversation was emotionally flat / neutral."
 
-    # weighted sentiment: strong emotions count more
-    weighted_score = sum(s * w for s, w in zip(scores, weights)) / total_weight
+    weighted_score = weighted_sum / total_weight
 
     # determine overall label from weighted score
     if weighted_score >= 0.05:
@@ -105,3 +199,57 @@ def summarize_conversation(history):
 
     return overall
 
+
+class RunningSummary:
+    """
+    Conversation summary updated in O(1) per turn.
+
+    add() keeps the running weighted sums, first/last label and transition
+    count, so overall() and trend() answer at any time. summarize_conversation
+    is this class run over the whole history, and trend() matches
+    analyze_trend.
+    """
+
+    def __init__(self, scores=()):
+        self.total_weight = 0.0
+        self.weighted_sum = 0.0
+        self.transitions = 0
+        self._labels = []  # kept only so the midway label is an O(1) lookup
+        for score in scores:
+            self.add(score)
+
+    @classmethod
+    def from_history(cls, history):
+        return cls(h["score"] for h in history)
+
+    def add(self, score):
+        # plain left-to-right float addition on every Python version (3.12's
+        # sum() compensates rounding, which can move a chat sitting right on
+        # the 0.05 threshold); chatbot.analytics reproduces exactly this order
+        weight = abs(score)
+        self.total_weight += weight
+        self.weighted_sum += score * weight
+
+        label = score_to_label(score)
+        if self._labels and label != self._labels[-1]:
+            self.transitions += 1
+        self._labels.append(label)
+
+    def __len__(self):
+        return len(self._labels)
+
+    def overall(self):
+        if not self._labels:
+            return "Neutral", "no messages to analyze."
+        return _overall_label(self.total_weight, self.weighted_sum)
+
+    def overall_label(self):
+        """Just the overall label; overall() adds an explanation for empty or flat chats."""
+        overall = self.overall()
+        return overall[0] if isinstance(overall, tuple) else overall
+
+    def trend(self):
+        labels = self._labels
+        if len(labels) < 2:
+            return "Not enough data to determine mood trend."
+        return _describe_trend(labels[0], labels[-1], labels[len(labels) // 2], self.transitions)
@@ -0,0 +1,275 @@
+"""
+Asyncio HTTP endpoint for the bot, with micro-batching.
+
+    python -m chatbot.server --port 8000
+
+    POST /reply      {"text": "..."}  -> reply, tag, score, label, compound
+    POST /sentiment  {"text": "..."}  -> label, compound
+    POST /summarize  {"scores": [...]} or {"history": [...]} -> overall, trend
+
+Concurrent /reply and /sentiment requests that arrive within max_delay of
+each other are coalesced into one answer_batch (one vectorize + similarity
+call) and one batched sentiment call, then fanned back out.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+from pathlib import Path
+
+from chatbot.bot_logic import SimpleRetrievalBot
+from chatbot.sentiment import RunningSummary, score_many
+
+logger = logging.getLogger(__name__)
+
+INTENTS_PATH = Path("intents.json")
+MAX_BODY_BYTES = 1 << 20
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+               413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class MicroBatcher:
+    """
+    Collects items submitted by concurrent callers and runs process_batch
+    once per batch in a worker thread, so the event loop keeps accepting
+    requests while a batch is being scored.
+
+    A batch is closed when max_batch items are waiting or max_delay seconds
+    have passed since its first item. Batches run one after another, so
+    requests arriving during a slow batch are naturally grouped into the next.
+    """
+
+    def __init__(self, process_batch, max_batch=64, max_delay=0.005):
+        self.process_batch = process_batch
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.batches = 0
+        self.items = 0
+        self._queue = None
+        self._worker = None
+
+    async def submit(self, item):
+        if self._worker is None:
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            items = [item for item, _ in batch]
+            try:
+                results = await loop.run_in_executor(None, self.process_batch, items)
+            except Exception as exc:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+            self.batches += 1
+            self.items += len(items)
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    def close(self):
+        if self._worker is not None:
+            self._worker.cancel()
+
+
+class ChatServer:
+    def __init__(self, bot, max_batch=64, max_delay=0.005):
+        self.bot = bot
+        self.reply_batcher = MicroBatcher(self._reply_batch, max_batch, max_delay)
+        self.sentiment_batcher = MicroBatcher(self._sentiment_batch, max_batch, max_delay)
+        self.routes = {
+            "/reply": self._handle_reply,
+            "/sentiment": self._handle_sentiment,
+            "/summarize": self._handle_summarize,
+        }
+
+    def _reply_batch(self, texts):
+        answers = self.bot.answer_batch(texts)
+        sentiments = score_many(texts)
+        return [
+            {"reply": reply, "tag": tag, "score": score, "label": label, "compound": compound}
+            for (reply, tag, score), (label, compound) in zip(answers, sentiments)
+        ]
+
+    def _sentiment_batch(self, texts):
+        return [{"label": label, "compound": compound} for label, compound in score_many(texts)]
+
+    async def _handle_reply(self, payload):
+        return await self.reply_batcher.submit(_text_field(payload))
+
+    async def _handle_sentiment(self, payload):
+        return await self.sentiment_batcher.submit(_text_field(payload))
+
+    async def _handle_summarize(self, payload):
+        if "scores" in payload:
+            scores = payload["scores"]
+            if not isinstance(scores, list) or not all(map(_is_number, scores)):
+                raise HTTPError(400, "'scores' must be a list of numbers")
+        elif "history" in payload:
+            history = payload["history"]
+            if not isinstance(history, list) or not all(
+                isinstance(turn, dict) and _is_number(turn.get("score")) for turn in history
+            ):
+                raise HTTPError(400, "'history' must be a list of turns with a numeric 'score'")
+            scores = [turn["score"] for turn in history]
+        else:
+            raise HTTPError(400, "expected 'scores' or 'history'")
+        summary = RunningSummary(scores)
+        return {"overall": summary.overall_label(), "trend": summary.trend()}
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request = await _read_request(reader)
+                if request is None:
+                    break
+                method, path, body, keep_alive = request
+                try:
+                    status, result = 200, await self._dispatch(method, path, body)
+                except HTTPError as exc:
+                    status, result = exc.status, {"error": str(exc)}
+                except Exception:
+                    # includes failures inside a batch, which every request of it gets
+                    logger.exception("Error handling %s %s", method, path)
+                    status, result = 500, {"error": "internal server error"}
+                _write_response(writer, status, result, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except HTTPError as exc:
+            _write_response(writer, exc.status, {"error": str(exc)}, False)
+        except Exception:
+            logger.exception("Error reading request")
+            _write_response(writer, 500, {"error": "internal server error"}, False)
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method, path, body):
+        handler = self.routes.get(path)
+        if handler is None:
+            raise HTTPError(404, f"unknown endpoint {path}")
+        if method != "POST":
+            raise HTTPError(405, "use POST")
+        try:
+            payload = json.loads(body or b"{}")
+        except ValueError:
+            raise HTTPError(400, "body is not valid JSON")
+        if not isinstance(payload, dict):
+            raise HTTPError(400, "body must be a JSON object")
+        return await handler(payload)
+
+    def close(self):
+        self.reply_batcher.close()
+        self.sentiment_batcher.close()
+
+
+def _is_number(value):
+    return (
+        isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+    )
+
+
+def _text_field(payload):
+    text = payload.get("text")
+    if not isinstance(text, str):
+        raise HTTPError(400, "expected a string 'text' field")
+    return text
+
+
+async def _read_request(reader):
+    """Parse one HTTP/1.1 request; None when the client closed the connection."""
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    try:
+        method, target, version = request_line.decode("latin-1").split()
+    except ValueError:
+        raise HTTPError(400, "malformed request line")
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get("content-length", 0) or 0)
+    except ValueError:
+        raise HTTPError(400, "invalid Content-Length")
+    if length < 0:
+        raise HTTPError(400, "invalid Content-Length")
+    if length > MAX_BODY_BYTES:
+        raise HTTPError(413, "request body too large")
+    body = await reader.readexactly(length) if length else b""
+
+    connection = headers.get("connection", "").lower()
+    keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+    return method, target.split("?", 1)[0], body, keep_alive
+
+
+def _write_response(writer, status, payload, keep_alive):
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    head = (
+        f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    writer.write(head.encode("latin-1") + body)
+
+
+async def serve(bot, host="127.0.0.1", port=8000, max_batch=64, max_delay=0.005):
+    chat_server = ChatServer(bot, max_batch=max_batch, max_delay=max_delay)
+    server = await asyncio.start_server(chat_server.handle_connection, host, port)
+    return chat_server, server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the chatbot over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--max-delay-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    async def run():
+        bot = SimpleRetrievalBot(INTENTS_PATH, min_confidence=0.3, auto_reload=True)
+        _, server = await serve(bot, args.host, args.port, args.max_batch, args.max_delay_ms / 1000)
+        print(f"Serving on http://{args.host}:{args.port}")
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+import sqlite3
+import threading
+from datetime import datetime
+
+from chatbot.metrics import timed
+
+DEFAULT_DB_PATH = "chats.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS conversations (
+    id          INTEGER PRIMARY KEY,
+    session_id  TEXT,
+    created_at  TEXT NOT NULL,
+    overall     TEXT,
+    trend       TEXT,
+    n_turns     INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS turns (
+    conversation_id INTEGER NOT NULL REFERENCES conversations(id) ON DELETE CASCADE,
+    idx             INTEGER NOT NULL,
+    user_text       TEXT NOT NULL,
+    bot_reply       TEXT NOT NULL,
+    label           TEXT NOT NULL,
+    score           REAL NOT NULL,
+    tag             TEXT,
+    PRIMARY KEY (conversation_id, idx)
+);
+CREATE INDEX IF NOT EXISTS conversations_created_at ON conversations(created_at);
+CREATE INDEX IF NOT EXISTS conversations_overall ON conversations(overall);
+CREATE INDEX IF NOT EXISTS conversations_session ON conversations(session_id, id);
+CREATE INDEX IF NOT EXISTS turns_label ON turns(label);
+CREATE INDEX IF NOT EXISTS turns_tag ON turns(tag);
+"""
+
+
+class ChatStore:
+    """
+    SQLite repository for completed conversations.
+
+    The database runs in WAL mode so readers (the History and Analysis
+    pages) never block the writer. Each thread gets its own connection,
+    which is what sqlite3 expects and what Streamlit's script threads need.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = str(path)
+        self._local = threading.local()
+        self._connect().executescript(SCHEMA)
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    @timed("storage.save_conversation")
+    def save_conversation(self, history, overall=None, trend=None, session_id=None,
+                          created_at=None):
+        """Insert a conversation and all of its turns in one transaction; returns its id."""
+        created_at = created_at or datetime.now().isoformat(timespec="seconds")
+        conn = self._connect()
+        with conn:
+            cur = conn.execute(
+                "INSERT INTO conversations (session_id, created_at, overall, trend, n_turns) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (session_id, created_at, overall, trend, len(history)),
+            )
+            conversation_id = cur.lastrowid
+            conn.executemany(
+                "INSERT INTO turns (conversation_id, idx, user_text, bot_reply, label, score, tag) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (conversation_id, i, h["User_text"], h["Bot_reply"], h["label"],
+                     h["score"], h.get("tag"))
+                    for i, h in enumerate(history)
+                ),
+            )
+        return conversation_id
+
+    def count_conversations(self, session_id=None):
+        if session_id is None:
+            row = self._connect().execute("SELECT COUNT(*) FROM conversations").fetchone()
+        else:
+            row = self._connect().execute(
+                "SELECT COUNT(*) FROM conversations WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return row[0]
+
+    def list_conversations(self, limit=20, offset=0, session_id=None):
+        """One page of conversation summaries (without turns), oldest first."""
+        if session_id is None:
+            rows = self._connect().execute(
+                "SELECT * FROM conversations ORDER BY id LIMIT ? OFFSET ?", (limit, offset)
+            )
+        else:
+            rows = self._connect().execute(
+                "SELECT * FROM conversations WHERE session_id = ? ORDER BY id LIMIT ? OFFSET ?",
+                (session_id, limit, offset),
+            )
+        return [dict(row) for row in rows]
+
+    def get_conversation(self, conversation_id):
+        row = self._connect().execute(
+            "SELECT * FROM conversations WHERE id = ?", (conversation_id,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(conversation_id)
+        conversation = dict(row)
+        conversation["history"] = self.get_turns(conversation_id)
+        return conversation
+
+    def get_turns(self, conversation_id):
+        """Turns in the same dict shape the app keeps in session state."""
+        rows = self._connect().execute(
+            "SELECT user_text, bot_reply, label, score, tag FROM turns "
+            "WHERE conversation_id = ? ORDER BY idx",
+            (conversation_id,),
+        )
+        turns = []
+        for user_text, bot_reply, label, score, tag in rows:
+            turn = {"User_text": user_text, "Bot_reply": bot_reply, "label": label, "score": score}
+            if tag is not None:
+                turn["tag"] = tag
+            turns.append(turn)
+        return turns
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def open_store(path=DEFAULT_DB_PATH):
+    """Process-wide ChatStore per database path, shared by all sessions."""
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = ChatStore(path)
+        return _stores[path]
@@ -0,0 +1,288 @@
+"""
+Many intent catalogs served from one process.
+
+Every tenant is scored in the same hashed word feature space as
+HashedIntentIndex, so there is no per-tenant vectorizer or vocabulary: one
+hasher turns a message into feature ids once, whichever tenant it is for.
+Each tenant keeps its own IDF (only for the buckets its patterns use), so
+its matches are exactly what SimpleRetrievalBot(path, backend="hashed")
+would return.
+
+The TF-IDF rows of all loaded tenants live in one stacked CSR layout
+(data / indices / indptr arrays) and a tenant is just a row range and an
+IDF range into it. Catalogs are read on first use and the least recently
+used ones are dropped when the loaded rows outgrow the memory budget.
+"""
+import json
+import random
+import threading
+from collections import OrderedDict, namedtuple
+from pathlib import Path
+
+import numpy as np
+
+from chatbot.bot_logic import (
+    FALLBACK_RESPONSES,
+    WORD_HASH_FEATURES,
+    _hashed_tfidf,
+    _parse_intents,
+    _word_hasher,
+)
+from chatbot.metrics import timed
+
+DEFAULT_MEMORY_BUDGET = 256 * 2**20
+
+# row_start/row_end index the stacked pattern rows, feat_start/feat_end the
+# stacked (feature, idf) pairs; tags[code] -> tag, responses[code] -> list
+_Slot = namedtuple(
+    "_Slot", "row_start row_end feat_start feat_end tags responses nbytes"
+)
+_Stack = namedtuple("_Stack", "data indices indptr pattern_tags features idf")
+
+
+def _empty_stack():
+    return _Stack(
+        data=np.zeros(0, dtype=np.float64),
+        indices=np.zeros(0, dtype=np.int32),
+        indptr=np.zeros(1, dtype=np.int64),
+        pattern_tags=np.zeros(0, dtype=np.int32),
+        features=np.zeros(0, dtype=np.int32),
+        idf=np.zeros(0, dtype=np.float64),
+    )
+
+
+def _text_bytes(tags, responses):
+    return sum(len(t) for t in tags) + sum(len(r) for rs in responses for r in rs)
+
+
+class TenantRegistry:
+    """
+    Intent catalogs keyed by tenant name, answered through one shared index.
+
+        registry = TenantRegistry({"acme": "acme/intents.json"})
+        registry.register_directory("catalogs")   # one tenant per *.json
+        registry.reply("acme", "hello")
+
+    memory_budget bounds the bytes held by loaded tenants (stacked arrays
+    plus response text); loading a tenant past it evicts the least recently
+    used others. A tenant bigger than the whole budget is still served, on
+    its own. Thread-safe: replies read an immutable snapshot of the stack,
+    loads and evictions swap in a new one under a lock.
+    """
+
+    def __init__(self, catalogs=None, memory_budget=DEFAULT_MEMORY_BUDGET,
+                 min_confidence=0.3, n_features=WORD_HASH_FEATURES):
+        self.memory_budget = memory_budget
+        self.min_confidence = min_confidence
+        self.loads = 0
+        self.evictions = 0
+        self._hasher = _word_hasher(n_features)
+        self._paths = {}
+        # (stack, slots) replaced together, never mutated in place
+        self._state = (_empty_stack(), {})
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        for tenant, path in (catalogs or {}).items():
+            self.register(tenant, path)
+
+    # ---------- catalogs ----------
+
+    def register(self, tenant, intents_path):
+        """Make a catalog available; it is only read on the tenant's first reply."""
+        with self._lock:
+            self._paths[tenant] = Path(intents_path)
+            if tenant in self._state[1]:
+                # registered again with a (possibly) new file: reload lazily
+                self._drop([tenant])
+
+    def register_directory(self, directory, pattern="*.json"):
+        """Register every matching file in directory under its file stem."""
+        for path in sorted(Path(directory).glob(pattern)):
+            self.register(path.stem, path)
+
+    def tenants(self):
+        return list(self._paths)
+
+    def loaded_tenants(self):
+        """Loaded tenants, least recently used first."""
+        with self._lock:
+            return list(self._lru)
+
+    def memory_usage(self):
+        return sum(slot.nbytes for slot in self._state[1].values())
+
+    def stats(self):
+        stack, slots = self._state
+        return {
+            "registered": len(self._paths),
+            "loaded": len(slots),
+            "patterns": len(stack.pattern_tags),
+            "bytes": self.memory_usage(),
+            "budget": self.memory_budget,
+            "loads": self.loads,
+            "evictions": self.evictions,
+        }
+
+    def evict(self, tenant):
+        with self._lock:
+            self._drop([tenant])
+
+    # ---------- loading and eviction ----------
+
+    def _slot_for(self, tenant):
+        stack, slots = self._state
+        slot = slots.get(tenant)
+        if slot is not None:
+            with self._lock:
+                if tenant in self._lru:
+                    self._lru.move_to_end(tenant)
+            return stack, slot
+        if tenant not in self._paths:
+            raise KeyError(f"unknown tenant: {tenant!r}")
+        with self._lock:
+            if tenant not in self._state[1]:
+                self._load(tenant)
+            self._lru.move_to_end(tenant)
+            stack, slots = self._state
+            return stack, slots[tenant]
+
+    def _load(self, tenant):
+        # caller holds self._lock
+        with open(self._paths[tenant], "r", encoding="utf-8") as f:
+            pattern_texts, pattern_to_tag, tag_to_responses = _parse_intents(json.load(f))
+
+        tags = list(tag_to_responses)
+        codes = {tag: i for i, tag in enumerate(tags)}
+        responses = [tag_to_responses[tag] for tag in tags]
+        counts, idf, tfidf = _hashed_tfidf(self._hasher.transform(pattern_texts))
+        tfidf.sort_indices()
+        features = np.flatnonzero(idf).astype(np.int32)
+
+        stack, slots = self._state
+        row_start = len(stack.pattern_tags)
+        feat_start = len(stack.features)
+        new_stack = _Stack(
+            data=np.concatenate([stack.data, tfidf.data]),
+            indices=np.concatenate([stack.indices, tfidf.indices.astype(np.int32)]),
+            indptr=np.concatenate([stack.indptr, stack.indptr[-1] + tfidf.indptr[1:]]),
+            pattern_tags=np.concatenate([
+                stack.pattern_tags,
+                np.array([codes[t] for t in pattern_to_tag], dtype=np.int32),
+            ]),
+            features=np.concatenate([stack.features, features]),
+            idf=np.concatenate([stack.idf, idf[features]]),
+        )
+        nbytes = (
+            tfidf.nnz * 12 + len(pattern_texts) * 12 + len(features) * 12
+            + _text_bytes(tags, responses)
+        )
+        slot = _Slot(
+            row_start, row_start + len(pattern_texts),
+            feat_start, feat_start + len(features),
+            tags, responses, nbytes,
+        )
+        self._state = (new_stack, {**slots, tenant: slot})
+        self._lru[tenant] = None
+        self.loads += 1
+
+        used = self.memory_usage()
+        cold = []
+        for name in self._lru:
+            if used <= self.memory_budget or name == tenant:
+                break
+            cold.append(name)
+            used -= slots[name].nbytes
+        self._drop(cold)
+
+    def _drop(self, tenants):
+        # caller holds self._lock; rebuilds the stack without these tenants
+        stack, slots = self._state
+        tenants = [t for t in tenants if t in slots]
+        if not tenants:
+            return
+        keep = [t for t in slots if t not in tenants]
+        parts = {field: [getattr(_empty_stack(), field)] for field in _Stack._fields}
+        new_slots = {}
+        row_start = feat_start = 0
+        nnz = 0
+        for name in keep:
+            slot = slots[name]
+            a, b = stack.indptr[slot.row_start], stack.indptr[slot.row_end]
+            parts["data"].append(stack.data[a:b])
+            parts["indices"].append(stack.indices[a:b])
+            parts["indptr"].append(stack.indptr[slot.row_start + 1:slot.row_end + 1] - a + nnz)
+            parts["pattern_tags"].append(stack.pattern_tags[slot.row_start:slot.row_end])
+            parts["features"].append(stack.features[slot.feat_start:slot.feat_end])
+            parts["idf"].append(stack.idf[slot.feat_start:slot.feat_end])
+            n_rows = slot.row_end - slot.row_start
+            n_feats = slot.feat_end - slot.feat_start
+            new_slots[name] = slot._replace(
+                row_start=row_start, row_end=row_start + n_rows,
+                feat_start=feat_start, feat_end=feat_start + n_feats,
+            )
+            row_start += n_rows
+            feat_start += n_feats
+            nnz += b - a
+        self._state = (
+            _Stack(**{field: np.concatenate(arrays) for field, arrays in parts.items()}),
+            new_slots,
+        )
+        for name in tenants:
+            self._lru.pop(name, None)
+        self.evictions += len(tenants)
+
+    # ---------- scoring ----------
+
+    def _query(self, stack, slot, text):
+        """Hashed feature ids and TF-IDF weights of text under the tenant's IDF."""
+        counts = self._hasher.transform([text])
+        features = stack.features[slot.feat_start:slot.feat_end]
+        if not len(features) or not counts.nnz:
+            return None
+        ids = counts.indices
+        pos = np.minimum(np.searchsorted(features, ids), len(features) - 1)
+        known = features[pos] == ids
+        if not known.any():
+            return None
+        order = np.argsort(ids[known])
+        ids = ids[known][order]
+        weights = (counts.data[known] * stack.idf[slot.feat_start + pos[known]])[order]
+        return ids, weights / np.linalg.norm(weights)
+
+    def _best(self, stack, slot, text):
+        """(tag code, score) of the best row in the tenant's range."""
+        n_rows = slot.row_end - slot.row_start
+        if not n_rows:
+            return None, 0.0
+        query = self._query(stack, slot, text)
+        if query is None:
+            return int(stack.pattern_tags[slot.row_start]), 0.0
+
+        ids, weights = query
+        a, b = stack.indptr[slot.row_start], stack.indptr[slot.row_end]
+        columns = stack.indices[a:b]
+        pos = np.minimum(np.searchsorted(ids, columns), len(ids) - 1)
+        contrib = np.where(ids[pos] == columns, stack.data[a:b] * weights[pos], 0.0)
+        rows = np.repeat(np.arange(n_rows), np.diff(stack.indptr[slot.row_start:slot.row_end + 1]))
+        sims = np.bincount(rows, weights=contrib, minlength=n_rows)
+        best = int(np.argmax(sims))
+        return int(stack.pattern_tags[slot.row_start + best]), float(sims[best])
+
+    @timed("tenants.classify")
+    def classify(self, tenant, text):
+        """Return (tag, score) of the tenant's best matching pattern."""
+        stack, slot = self._slot_for(tenant)
+        code, score = self._best(stack, slot, text)
+        return (slot.tags[code] if code is not None else None), score
+
+    @timed("tenants.reply")
+    def answer(self, tenant, text):
+        """Return (reply, tag, score); tag is None when the fallback is used."""
+        stack, slot = self._slot_for(tenant)
+        code, score = self._best(stack, slot, text)
+        if code is None or score < self.min_confidence:
+            return random.choice(FALLBACK_RESPONSES), None, score
+        return random.choice(slot.responses[code] or ["Sorry."]), slot.tags[code], score
+
+    def reply(self, tenant, text):
+        return self.answer(tenant, text)[0]
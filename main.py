@@ -1,22 +1,22 @@
+import argparse
+import sys
 from pathlib import Path
 
-from chatbot.bot_logic import SimpleRetrievalBot
+from chatbot.bot_logic import ResponseRotator, SimpleRetrievalBot
 from chatbot.sentiment import get_sentiment_label_and_score, analyze_trend, summarize_conversation
-from chatbot.history import save_history
+from chatbot.history import ConversationHistory, save_history
 from chatbot.export_chat import export_chat
+from chatbot.replay import INPUT_FORMATS, run_replay
 
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 INTENTS_PATH = Path("intents.json")
 
 def main():
-    # Sentiment setup
-    sia = SentimentIntensityAnalyzer()
-
     # Bot setup
-    bot = SimpleRetrievalBot(INTENTS_PATH, min_confidence=0.3)
+    bot = SimpleRetrievalBot(INTENTS_PATH, min_confidence=0.3, auto_reload=True)
 
     # Conversation history
-    history = [] 
+    history = ConversationHistory()
+    rotator = ResponseRotator()
 
     print("Chatbot ready. Type '/quit' to exit.\n")
     while True:
@@ -29,7 +29,7 @@ def main():
         print(f"→ Sentiment: {sentiment_label} ")
 
         # Get bot reply
-        reply = bot.reply(user)
+        reply = bot.reply(user, rotator)
         print(f"Bot: {reply}\n")
 
         history.append({"User_text": user, "label": sentiment_label, "score": compound,"Bot_reply": reply})
@@ -45,8 +45,47 @@ def main():
     trend = analyze_trend(score)
     print(f"Mood trend: {trend}")
 
-    save_history(history)
+    save_history(history, overall=overall_label, trend=trend)
     export_chat(history)
 
+def batch_main(args):
+    """Non-interactive mode: replay a message log and write JSONL results."""
+    bot = SimpleRetrievalBot(INTENTS_PATH, min_confidence=0.3)
+
+    input_stream = sys.stdin if args.input == "-" else open(args.input, "r", encoding="utf-8")
+    output_stream = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        run_replay(
+            bot,
+            input_stream,
+            output_stream,
+            fmt=args.format,
+            batch_size=args.batch_size,
+            workers=args.workers,
+        )
+    finally:
+        if input_stream is not sys.stdin:
+            input_stream.close()
+        if output_stream is not sys.stdout:
+            output_stream.close()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Sentiment-aware chatbot. Interactive unless --input is given."
+    )
+    parser.add_argument("--input", help="message log to replay, one message per line ('-' for stdin)")
+    parser.add_argument("--output", default="-", help="JSONL results file (default: stdout)")
+    parser.add_argument("--format", choices=INPUT_FORMATS, default="lines",
+                        help="input format: plain lines or JSONL with a 'text' field")
+    parser.add_argument("--batch-size", type=int, default=512)
+    parser.add_argument("--workers", type=int, default=1, help="sentiment worker processes")
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    if args.input:
+        batch_main(args)
+    else:
+        main()
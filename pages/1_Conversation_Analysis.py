@@ -1,19 +1,34 @@
 # pages/1_Conversation_Analysis.py
+import io
+
 import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt  
-from chatbot.sentiment import analyze_trend, summarize_conversation
 
+from chatbot.analytics import downsample_minmax
+from chatbot.history import ConversationHistory
+from chatbot.import_chat import IMPORT_SESSION_ID
+from chatbot.sentiment import RunningSummary
+from chatbot.storage import open_store
+
+
+# charts of longer chats are drawn from at most this many (min/max) points
+MAX_CHART_POINTS = 2000
+# above this many messages the native chart is the default
+LONG_HISTORY = 500
+
+
+def plot_simple_sentiment_graph(scores):
+    # matplotlib is only imported once there is a chat to draw
+    import matplotlib.pyplot as plt
 
-def plot_simple_sentiment_graph(history):
     # Use VADER compound scores as intensity
-    scores = [h["score"] for h in history]
-    msg_numbers = list(range(1, len(scores) + 1))
+    positions, values = downsample_minmax(scores, MAX_CHART_POINTS)
+    msg_numbers = positions + 1
 
     fig, ax = plt.subplots(figsize=(10, 4))
 
-    # Line of intensity over time
-    ax.plot(msg_numbers, scores, marker="o", linewidth=2)
+    # Line of intensity over time (markers only while they stay readable)
+    marker = "o" if len(scores) <= LONG_HISTORY else None
+    ax.plot(msg_numbers, values, marker=marker, linewidth=2)
 
     # Zero (neutral) reference line
     ax.axhline(0, color="gray", linewidth=1, linestyle="--", alpha=0.7)
@@ -33,43 +48,99 @@ def plot_simple_sentiment_graph(history):
     return fig
 
 
+# Chart and table caches are keyed by (chat key, number of turns) only: a
+# stored chat never changes, and an ongoing one only grows, so the turns
+# themselves (underscore arguments) are not hashed on every rerun.
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def load_turns(chat_id):
+    return ConversationHistory(open_store().get_turns(chat_id))
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def sentiment_chart_png(chat_key, n_turns, _scores):
+    import matplotlib.pyplot as plt
+
+    fig = plot_simple_sentiment_graph(_scores)
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", bbox_inches="tight")
+    plt.close(fig)
+    return buffer.getvalue()
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def sentiment_chart_points(chat_key, n_turns, _scores):
+    import pandas as pd
+
+    positions, values = downsample_minmax(_scores, MAX_CHART_POINTS)
+    return pd.DataFrame({"Message #": positions + 1, "Sentiment": values})
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def message_table(chat_key, n_turns, _history):
+    frame = _history.to_frame(texts=True)
+    frame.index += 1
+    return frame.rename_axis("Message #").rename(columns={
+        "User_text": "User message",
+        "label": "User sentiment",
+        "score": "Sentiment score",
+        "Bot_reply": "Bot reply",
+    })[["User message", "User sentiment", "Sentiment score", "Bot reply"]].round(3)
+
+
 def main():
     st.title("Conversation Analysis")
 
-    # All completed chats stored by your app
-    chats = st.session_state.get("chats", [])
-    current_history = st.session_state.get("history", [])
+    # Completed chats of this session, stored by the app in SQLite, or the
+    # chats brought in by chatbot.import_chat
+    store = open_store()
+    session_id = st.session_state.get("session_id")
+    source_id = session_id
+    if store.count_conversations(session_id=IMPORT_SESSION_ID):
+        source = st.radio("Show", ["This session", "Imported transcripts"], horizontal=True)
+        if source == "Imported transcripts":
+            source_id = IMPORT_SESSION_ID
+    n_chats = store.count_conversations(session_id=source_id) if source_id else 0
+    current_history = st.session_state.get("history", ConversationHistory())
+    current_summary = st.session_state.get("summary")
     finished_current = st.session_state.get("finished", False)
 
     # --------- Choose which conversation to analyze ---------
     history = None
+    chat_key = None
     overall_label = None
     trend_text = None
 
-    if chats:
+    if n_chats:
         st.subheader("Select conversation")
 
         # remember last selected chat, default to latest
-        if "analysis_selected_chat_index" not in st.session_state:
-            st.session_state.analysis_selected_chat_index = len(chats) - 1
+        if st.session_state.get("analysis_selected_chat_index", n_chats) >= n_chats:
+            st.session_state.analysis_selected_chat_index = n_chats - 1
 
         idx = st.selectbox(
             "Choose a chat:",
-            options=list(range(len(chats))),
+            options=list(range(n_chats)),
             index=st.session_state.analysis_selected_chat_index,
             format_func=lambda i: f"Chat {i + 1}",
         )
         st.session_state.analysis_selected_chat_index = idx
 
-        selected = chats[idx]
-        history = selected["history"]
+        # fetch just the selected chat, not every stored one
+        selected = store.list_conversations(limit=1, offset=idx, session_id=source_id)[0]
+        history = load_turns(selected["id"])
+        chat_key = f"chat:{selected['id']}"
         overall_label = selected.get("overall")
         trend_text = selected.get("trend")
         finished = True  # saved chats are always finished
     else:
         # Fallback: no saved chats yet, use current ongoing one
         history = current_history
+        chat_key = f"live:{session_id}"
         finished = finished_current
+        if current_summary is not None and len(current_summary) == len(history):
+            overall_label = current_summary.overall()
+            trend_text = current_summary.trend()
 
     if not history:
         st.info(
@@ -82,12 +153,11 @@ def main():
     # --------- Overall summary ---------
     st.subheader("Overall Sentiment")
 
-    # If we don't have cached values (e.g. current ongoing chat), recompute
-    if overall_label is None:
-        overall_label = summarize_conversation(history)
-    if trend_text is None:
-        scores = [h["score"] for h in history]
-        trend_text = analyze_trend(scores)
+    # If we don't have cached values (e.g. no running summary), recompute
+    if overall_label is None or trend_text is None:
+        summary = RunningSummary.from_history(history)
+        overall_label = summary.overall()
+        trend_text = summary.trend()
 
     st.markdown(f"**Overall conversation sentiment:** {overall_label}")
     st.markdown(f"**Mood trend:** {trend_text}")
@@ -100,24 +170,24 @@ def main():
 
     st.markdown("---")
 
-    # --------- Build dataframe once (for table) ---------
-    rows = [
-        {
-            "Message #": i + 1,
-            "User message": h["User_text"],
-            "User sentiment": h["label"],
-            "Sentiment score": round(h["score"], 3),
-            "Bot reply": h["Bot_reply"],
-        }
-        for i, h in enumerate(history)
-    ]
-    df = pd.DataFrame(rows)
+    scores = history.scores
 
     # --------- Simple categorical line graph ---------
     st.subheader("Sentiment Over Conversation")
 
-    fig = plot_simple_sentiment_graph(history)
-    st.pyplot(fig)
+    native = st.toggle(
+        "Fast interactive chart",
+        value=len(history) > LONG_HISTORY,
+        help=f"Chats longer than {MAX_CHART_POINTS} messages are downsampled, keeping every peak.",
+    )
+    if native:
+        st.line_chart(
+            sentiment_chart_points(chat_key, len(history), scores),
+            x="Message #",
+            y="Sentiment",
+        )
+    else:
+        st.image(sentiment_chart_png(chat_key, len(history), scores))
 
     st.caption(
         "This chart shows how the user's sentiment moves between Negative, Neutral, and Positive across the conversation."
@@ -128,7 +198,7 @@ def main():
     # --------- Detailed table ---------
     st.subheader("Message-Level Sentiment")
 
-    st.dataframe(df)
+    st.dataframe(message_table(chat_key, len(history), history))
 
     st.markdown(
         "_This page uses the same sentiment scores as the chat page "
@@ -2,38 +2,73 @@
 
 import streamlit as st
 
+from chatbot.export_chat import EXPORT_FORMATS, iter_export
+from chatbot.import_chat import IMPORT_SESSION_ID
+from chatbot.storage import open_store
+
+CHATS_PER_PAGE = 20
+
+
+def choose_session(store):
+    """This browser session's chats, or the imported transcripts if there are any."""
+    session_id = st.session_state.get("session_id")
+    if not store.count_conversations(session_id=IMPORT_SESSION_ID):
+        return session_id
+    source = st.radio("Show", ["This session", "Imported transcripts"], horizontal=True)
+    return session_id if source == "This session" else IMPORT_SESSION_ID
+
 
 def main():
-    st.title("Conversation History (Current Session)")
+    st.title("Conversation History")
 
-    chats = st.session_state.get("chats", [])
+    store = open_store()
+    session_id = choose_session(store)
+    total = store.count_conversations(session_id=session_id) if session_id else 0
 
-    if not chats:
+    if not total:
         st.info("No completed chats yet. End a conversation using `/quit`, `quit`, or `exit` to add it here.")
         return
 
     st.subheader("Select a conversation to view")
 
-    chat_index = st.selectbox(
+    # only one page of chat summaries is loaded at a time
+    n_pages = (total + CHATS_PER_PAGE - 1) // CHATS_PER_PAGE
+    page = 1
+    if n_pages > 1:
+        page = st.number_input("Page", min_value=1, max_value=n_pages, value=n_pages)
+    offset = (page - 1) * CHATS_PER_PAGE
+    chats = store.list_conversations(
+        limit=CHATS_PER_PAGE, offset=offset, session_id=session_id
+    )
+
+    position = st.selectbox(
         "Choose a chat:",
         options=list(range(len(chats))),
-        format_func=lambda i: f"Chat {i + 1}",
+        format_func=lambda i: f"Chat {offset + i + 1}",
     )
 
-    selected = chats[chat_index]
+    selected = chats[position]
+    chat_number = offset + position + 1
+    history = store.get_turns(selected["id"])
 
     st.markdown("---")
     st.subheader("Download This Conversation")
 
-    st.download_button(
-        label="Download Chat as TXT",
-        data=selected["export_text"],
-        file_name=f"chat_{chat_index + 1}.txt",
-        mime="text/plain",
-    )
+    fmt = st.radio("Format", options=list(EXPORT_FORMATS), horizontal=True)
+    extension, mime = EXPORT_FORMATS[fmt]
+
+    # the transcript is only built on the run where it was asked for, not on
+    # every rerun of the page
+    if st.button(f"Prepare {extension.upper()} download"):
+        st.download_button(
+            label=f"Download Chat as {extension.upper()}",
+            data="".join(iter_export(history, fmt)),
+            file_name=f"chat_{chat_number}.{extension}",
+            mime=mime,
+        )
 
     st.markdown("---")
-    st.subheader(f"Chat {chat_index + 1} Summary")
+    st.subheader(f"Chat {chat_number} Summary")
 
     st.markdown(f"**Overall Sentiment:** {selected['overall']}")
     st.markdown(f"**Mood Trend:** {selected['trend']}")
@@ -41,7 +76,7 @@ def main():
 
     st.subheader("Full Conversation")
 
-    for turn in selected["history"]:
+    for turn in history:
         with st.chat_message("user"):
             st.markdown(turn["User_text"])
             st.markdown(f"_Sentiment: **{turn['label']}**_")
@@ -0,0 +1,69 @@
+# pages/3_Diagnostics.py
+import streamlit as st
+
+from chatbot import metrics
+from chatbot.sentiment import sentiment_cache_info
+
+
+def cache_table():
+    caches = {"sentiment scores": sentiment_cache_info()}
+    if "bot" in st.session_state:
+        caches["intent matches"] = st.session_state.bot.cache_info()
+    rows = [
+        {
+            "cache": name,
+            "hit rate": f"{info['hit_rate']:.1%}",
+            "hits": info["hits"],
+            "misses": info["misses"],
+            "expired": info["expired"],
+            "size": f"{info['size']} / {info['maxsize']}",
+            "ttl s": info["ttl"],
+        }
+        for name, info in caches.items()
+    ]
+    st.subheader("Caches")
+    st.dataframe(rows, hide_index=True)
+
+
+def main():
+    st.title("Diagnostics")
+
+    # process-wide: covers every session served by this Streamlit process
+    enabled = st.toggle("Record per-stage timings", value=metrics.is_enabled())
+    if enabled != metrics.is_enabled():
+        if enabled:
+            metrics.enable()
+        else:
+            metrics.disable()
+
+    if st.button("Reset timings"):
+        metrics.reset()
+
+    cache_table()
+
+    st.subheader("Stage timings")
+    stats = metrics.snapshot()
+    if not stats:
+        st.info("No timings recorded yet. Enable recording and chat with the bot.")
+        return
+
+    rows = [
+        {
+            "stage": name,
+            "calls": s["count"],
+            "mean ms": round(s["mean"] * 1000, 3),
+            "p50 ms": round(s["p50"] * 1000, 3),
+            "p99 ms": round(s["p99"] * 1000, 3),
+            "max ms": round(s["max"] * 1000, 3),
+            "total s": round(s["sum"], 3),
+        }
+        for name, s in stats.items()
+    ]
+    st.dataframe(rows, hide_index=True)
+
+    with st.expander("Prometheus text"):
+        st.code(metrics.prometheus_text(), language="text")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import random
+
+import numpy as np
+
+from chatbot.analytics import (
+    LABELS,
+    downsample_minmax,
+    summarize_many,
+    transition_counts,
+    trend_many,
+)
+from chatbot.sentiment import analyze_trend, summarize_conversation
+
+
+def _random_conversations(n, seed=0):
+    rng = random.Random(seed)
+    values = [0.0, 0.05, -0.05, 0.049, 0.3, -0.4, 0.8, -0.6]
+    return [
+        [rng.choice(values + [round(rng.uniform(-1, 1), 4)]) for _ in range(rng.randint(0, 12))]
+        for _ in range(n)
+    ]
+
+
+def _flatten(conversations):
+    scores = [s for conv in conversations for s in conv]
+    offsets = np.concatenate(([0], np.cumsum([len(c) for c in conversations])))
+    return scores, offsets
+
+
+def test_trend_many_matches_analyze_trend():
+    conversations = _random_conversations(2000)
+    scores, offsets = _flatten(conversations)
+
+    assert trend_many(scores, offsets) == [analyze_trend(c) for c in conversations]
+
+
+def test_summarize_many_matches_summarize_conversation():
+    conversations = _random_conversations(2000, seed=1)
+    # sits exactly on the 0.05 threshold only if summed left to right
+    conversations.append([0.8, -0.6, -0.4, 0.05, 0.05, -0.4, 0.3, 0.3])
+    scores, offsets = _flatten(conversations)
+
+    for conv, code in zip(conversations, summarize_many(scores, offsets)):
+        expected = summarize_conversation([{"score": s} for s in conv])
+        if isinstance(expected, tuple):  # empty / flat chats
+            expected = expected[0]
+        assert LABELS[code] == expected
+
+
+def test_summarize_many_long_conversations_match_summarize_conversation():
+    rng = random.Random(2)
+    long_chat = [round(rng.uniform(-1, 1), 4) for _ in range(50_000)]
+    conversations = _random_conversations(40, seed=3) + [
+        long_chat,
+        long_chat[:30_000],
+        [0.8, -0.6, -0.4, 0.05, 0.05, -0.4, 0.3, 0.3] * 500,
+    ]
+    scores, offsets = _flatten(conversations)
+
+    for conv, code in zip(conversations, summarize_many(scores, offsets)):
+        expected = summarize_conversation([{"score": s} for s in conv])
+        if isinstance(expected, tuple):
+            expected = expected[0]
+        assert LABELS[code] == expected
+
+
+def test_transition_counts_ignore_conversation_boundaries():
+    scores, offsets = _flatten([[0.5, -0.5, 0.5], [-0.5], [0.0, 0.0]])
+
+    assert transition_counts(scores, offsets).tolist() == [2, 0, 0]
+
+
+def test_downsample_minmax_keeps_extremes_and_bounds_points():
+    rng = np.random.default_rng(0)
+    scores = rng.uniform(-0.5, 0.5, 10_001)
+    scores[1234], scores[9876] = 1.0, -1.0
+
+    positions, values = downsample_minmax(scores, 2000)
+
+    assert len(positions) <= 2000
+    assert np.all(np.diff(positions) > 0) and positions[-1] < len(scores)
+    assert {1234, 9876} <= set(positions.tolist())
+    assert np.array_equal(values, scores[positions])
+
+    short = [0.1, -0.2, 0.3]
+    positions, values = downsample_minmax(short, 2000)
+    assert positions.tolist() == [0, 1, 2] and values.tolist() == short
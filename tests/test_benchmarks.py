@@ -0,0 +1,28 @@
+from benchmarks.run import compare
+from benchmarks.synthetic import synthetic_history, synthetic_intents
+
+
+def _report(**values):
+    return {"results": {name: {"value": v, "unit": u} for name, (v, u) in values.items()}}
+
+
+def test_synthetic_data_is_deterministic():
+    data = synthetic_intents(45, patterns_per_intent=20)
+    assert [len(i["patterns"]) for i in data["intents"]] == [20, 20, 5]
+    assert data == synthetic_intents(45, patterns_per_intent=20)
+    history = synthetic_history(10)
+    assert history == synthetic_history(10)
+    assert all(-1.0 <= t["score"] <= 1.0 for t in history)
+
+
+def test_compare_flags_regressions_in_the_right_direction():
+    baseline = _report(reply=(1.0, "ms"), throughput=(1000.0, "msg/s"), save=(2.0, "ms"))
+    current = _report(reply=(1.5, "ms"), throughput=(800.0, "msg/s"), save=(1.0, "ms"),
+                      new=(5.0, "ms"))
+
+    regressions = compare(current, baseline, threshold=0.10)
+
+    assert [(name, round(change, 2)) for name, _, _, change in regressions] == [
+        ("reply", 0.5), ("throughput", 0.2)
+    ]
+    assert compare(current, baseline, threshold=0.6) == []
@@ -1,11 +1,24 @@
+import json
 from pathlib import Path
-from chatbot.bot_logic import SimpleRetrievalBot
+
+import pytest
+
+from chatbot import bot_logic
+from chatbot.bot_logic import (
+    HashedIntentIndex,
+    IntentIndex,
+    ResponseRotator,
+    RetrievalIndex,
+    SimpleRetrievalBot,
+    index_dir_for,
+    intents_hash,
+)
 
 INTENTS_PATH = Path("intents.json")
 
 
 def test_bot_reply_is_string():
-    bot = SimpleRetrievalBot(INTENTS_PATH, min_confidence=0.0)
+    bot = SimpleRetrievalBot(INTENTS_PATH, use_index_cache=False, min_confidence=0.0)
     reply = bot.reply("hello")
 
     assert isinstance(reply, str)
@@ -13,9 +26,267 @@ def test_bot_reply_is_string():
 
 
 def test_bot_fallback_for_nonsense():
-    bot = SimpleRetrievalBot(INTENTS_PATH, min_confidence=0.99)
+    bot = SimpleRetrievalBot(INTENTS_PATH, use_index_cache=False, min_confidence=0.99)
 
     reply = bot.reply("sdlfkjsdlfkjweoiruwoeiur")
     text = reply.lower()
 
     assert ("sorry" in text) or ("not sure" in text)
+
+
+def test_classify_batch_matches_single_messages():
+    bot = SimpleRetrievalBot(INTENTS_PATH, use_index_cache=False, min_confidence=0.3)
+    texts = ["hello", "thank you so much", "sdlfkjsdlfkjweoiruwoeiur", "bye"]
+
+    batch = bot.classify_batch(texts)
+    single = [bot.classify_batch([t])[0] for t in texts]
+
+    assert [tag for tag, _ in batch] == [tag for tag, _ in single]
+    assert [s for _, s in batch] == [s for _, s in single]
+    assert batch[0][0] == "greeting"
+
+
+def test_reply_batch_handles_empty_input():
+    bot = SimpleRetrievalBot(INTENTS_PATH, use_index_cache=False, min_confidence=0.0)
+    replies = bot.reply_batch(["hello", "   "])
+
+    assert len(replies) == 2
+    assert replies[1] == "Please say something."
+
+
+def test_compiled_index_is_reused_and_matches(tmp_path):
+    intents_path = tmp_path / "intents.json"
+    intents_path.write_bytes(INTENTS_PATH.read_bytes())
+    texts = ["hello", "thanks a lot", "goodbye", "sdlfkjsdlfkjweoiruwoeiur"]
+
+    fresh = SimpleRetrievalBot(intents_path, use_index_cache=False)
+    cold = SimpleRetrievalBot(intents_path)
+    assert (index_dir_for(intents_path) / intents_hash(intents_path)).is_dir()
+    cached = SimpleRetrievalBot(intents_path)
+
+    assert cached.classify_batch(texts) == fresh.classify_batch(texts)
+    assert cold.classify_batch(texts) == fresh.classify_batch(texts)
+    assert cached.tag_to_responses == fresh.tag_to_responses
+
+
+def test_compiled_index_rebuilt_when_intents_change(tmp_path):
+    intents_path = tmp_path / "intents.json"
+    intents_path.write_text(
+        '{"intents": [{"tag": "greeting", "patterns": ["hello"], "responses": ["Hi!"]}]}'
+    )
+    SimpleRetrievalBot(intents_path)
+    old_hash = intents_hash(intents_path)
+
+    intents_path.write_text(
+        '{"intents": [{"tag": "weather", "patterns": ["is it raining"], "responses": ["No."]}]}'
+    )
+    bot = SimpleRetrievalBot(intents_path, min_confidence=0.0)
+
+    assert bot.reply("raining today?") == "No."
+    assert not (index_dir_for(intents_path) / old_hash).exists()
+
+
+def test_rank_returns_sorted_top_k():
+    bot = SimpleRetrievalBot(INTENTS_PATH, use_index_cache=False)
+    ranked = bot.rank("hello there", k=3)
+
+    assert len(ranked) == 3
+    assert ranked[0][0] == "greeting"
+    assert ranked[0][0] == bot.classify_batch(["hello there"])[0][0]
+    scores = [score for _, score in ranked]
+    assert scores == sorted(scores, reverse=True)
+    assert len({tag for tag, _ in ranked}) == 3
+
+
+def test_rank_mean_aggregation_matches_manual_average():
+    bot = SimpleRetrievalBot(INTENTS_PATH, use_index_cache=False)
+    sims = bot._index.similarities(["good morning"])[0]
+    expected = {
+        tag: sims[[i for i, t in enumerate(bot.pattern_to_tag) if t == tag]].mean()
+        for tag in bot.tags
+    }
+
+    for tag, score in bot.rank("good morning", k=len(bot.tags), agg="mean"):
+        assert abs(score - expected[tag]) < 1e-12
+
+
+def test_inverted_engine_matches_brute_force():
+    brute = SimpleRetrievalBot(INTENTS_PATH, use_index_cache=False)
+    inverted = SimpleRetrievalBot(INTENTS_PATH, use_index_cache=False, engine="inverted")
+    texts = ["hello", "thank you so much", "sdlfkjsdlfkjweoiruwoeiur", "bye for now",
+             "", "what can you do", "i am very angry with the service"]
+
+    assert inverted.classify_batch(texts) == brute.classify_batch(texts)
+
+
+def test_inverted_engine_batches_regardless_of_the_dense_cell_budget(monkeypatch):
+    monkeypatch.setattr(bot_logic, "MAX_SIM_CELLS", 1)
+    bot = SimpleRetrievalBot(INTENTS_PATH, engine="inverted", use_index_cache=False,
+                             cache_size=0)
+    index = bot._current_index()
+    calls = []
+    best_candidates = index.best_candidates
+    monkeypatch.setattr(index, "best_candidates",
+                        lambda texts: calls.append(len(texts)) or best_candidates(texts))
+
+    bot.classify_batch(["hello", "bye", "thanks"])
+
+    assert calls == [3]
+
+
+def test_reload_if_changed_swaps_index(tmp_path):
+    intents_path = tmp_path / "intents.json"
+    data = {"intents": [
+        {"tag": "greeting", "patterns": ["hello", "hi there"], "responses": ["Hi!"]},
+        {"tag": "goodbye", "patterns": ["bye", "see you"], "responses": ["Bye!"]},
+    ]}
+    intents_path.write_text(json.dumps(data))
+    bot = SimpleRetrievalBot(intents_path, min_confidence=0.0)
+    assert bot.reload_if_changed() is None
+
+    data["intents"][0]["responses"] = ["Hello again!"]
+    data["intents"][1]["patterns"] = ["bye", "see you there"]
+    data["intents"].append({"tag": "thanks", "patterns": ["thanks"], "responses": ["Welcome!"]})
+    intents_path.write_text(json.dumps(data))
+    diff = bot.reload_if_changed()
+
+    assert diff == {"added": ["thanks"], "removed": [], "changed": ["greeting", "goodbye"]}
+    assert bot.reply("hello") == "Hello again!"
+    assert bot.reply("thanks") == "Welcome!"
+    rebuilt = SimpleRetrievalBot(intents_path, use_index_cache=False)
+    assert bot.classify_batch(["see you", "hi"]) == rebuilt.classify_batch(["see you", "hi"])
+
+
+def test_broken_intents_file_keeps_serving_the_loaded_index(tmp_path, monkeypatch):
+    intents_path = tmp_path / "intents.json"
+    intents_path.write_text(json.dumps({"intents": [
+        {"tag": "greeting", "patterns": ["hello"], "responses": ["Hi!"]},
+    ]}))
+    bot = SimpleRetrievalBot(intents_path, auto_reload=True, cache_size=0, reload_interval=0)
+
+    intents_path.write_text('{"intents": [{"tag": "a", "patt')  # half-saved edit
+    assert bot.reply("hello") == "Hi!"
+
+    # the broken content is parsed once, not on every reply
+    reads = []
+    monkeypatch.setattr(bot, "_read_intents", lambda: reads.append(1))
+    assert bot.reply("hello") == "Hi!"
+    assert reads == []
+
+    intents_path.write_text(json.dumps({"intents": [{"tag": "empty", "patterns": []}]}))
+    monkeypatch.undo()
+    assert bot.reply("hello") == "Hi!"
+
+
+def test_auto_reload_checks_the_file_at_most_once_per_interval(tmp_path):
+    intents_path = tmp_path / "intents.json"
+    intents_path.write_text(json.dumps({"intents": [
+        {"tag": "greeting", "patterns": ["hello"], "responses": ["Hi!"]},
+    ]}))
+    bot = SimpleRetrievalBot(intents_path, auto_reload=True, reload_interval=3600)
+    assert bot.reply("hello") == "Hi!"
+
+    intents_path.write_text(json.dumps({"intents": [
+        {"tag": "greeting", "patterns": ["hello"], "responses": ["Hello again!"]},
+    ]}))
+    assert bot.reply("hello") == "Hi!"  # not due for a check yet
+
+    bot._next_reload_check = 0.0
+    assert bot.reply("hello") == "Hello again!"
+
+
+def test_incremental_index_update_matches_full_build():
+    data = json.loads(INTENTS_PATH.read_text())
+    index = IntentIndex.build(data)
+
+    data["intents"][0]["patterns"][0] = "hello there"
+    data["intents"][1]["responses"].append("Another reply.")
+    del data["intents"][2]["patterns"][0]
+    updated = index.updated(data)
+    rebuilt = IntentIndex.build(data)
+
+    assert updated.pattern_to_tag == rebuilt.pattern_to_tag
+    assert updated.vectorizer.vocabulary_ == rebuilt.vectorizer.vocabulary_
+    assert (updated.tfidf_t != rebuilt.tfidf_t).nnz == 0
+    assert (updated.vectorizer.idf_ == rebuilt.vectorizer.idf_).all()
+
+
+def test_match_cache_serves_repeated_messages():
+    bot = SimpleRetrievalBot(INTENTS_PATH, use_index_cache=False)
+    first = bot.classify_batch(["Hello there"])
+    second = bot.classify_batch(["  hello   THERE "])
+
+    assert first == second
+    info = bot.cache_info()
+    assert info["hits"] == 1
+    assert info["misses"] == 1
+
+
+def test_response_rotator_does_not_repeat_replies(tmp_path):
+    intents_path = tmp_path / "intents.json"
+    intents_path.write_text(json.dumps({"intents": [
+        {"tag": "greeting", "patterns": ["hello"], "responses": ["Hi!", "Hello!", "Hey!"]},
+    ]}))
+    bot = SimpleRetrievalBot(intents_path, use_index_cache=False)
+    rotator = ResponseRotator()
+
+    replies = [bot.reply("hello", rotator) for _ in range(30)]
+    for start in range(0, 30, 3):
+        assert sorted(replies[start:start + 3]) == ["Hello!", "Hey!", "Hi!"]
+    assert all(a != b for a, b in zip(replies, replies[1:]))
+
+
+def test_dense_backend_matches_paraphrases_and_shares_the_api(tmp_path):
+    intents_path = tmp_path / "intents.json"
+    intents_path.write_bytes(INTENTS_PATH.read_bytes())
+    texts = ["helo there", "thank u so much", "how u doin", "   "]
+
+    tfidf = SimpleRetrievalBot(intents_path)
+    dense = SimpleRetrievalBot(intents_path, backend="dense")
+    cached = SimpleRetrievalBot(intents_path, backend="dense")
+
+    # both compiled indexes live side by side
+    digest = intents_hash(intents_path)
+    assert (index_dir_for(intents_path) / digest).is_dir()
+    assert (index_dir_for(intents_path) / f"{digest}-dense").is_dir()
+
+    assert [tag for _, tag, _ in dense.answer_batch(texts)] == ["greeting", "thanks", "greeting", None]
+    assert cached.classify_batch(texts[:3]) == dense.classify_batch(texts[:3])
+    assert dense.rank("thank u", k=2)[0][0] == "thanks"
+    assert len(tfidf.reply_batch(texts)) == len(dense.reply_batch(texts))
+
+
+def test_hashed_backend_agrees_with_tfidf_and_updates_without_refit(tmp_path):
+    intents_path = tmp_path / "intents.json"
+    intents_path.write_bytes(INTENTS_PATH.read_bytes())
+    texts = ["hello", "thanks a lot", "goodbye", "xyz what can you do", "sdlfkjsdlfkjweoiruwoeiur"]
+
+    tfidf = SimpleRetrievalBot(intents_path, use_index_cache=False)
+    hashed = SimpleRetrievalBot(intents_path, backend="hashed")
+    cached = SimpleRetrievalBot(intents_path, backend="hashed", engine="inverted")
+
+    def rounded(results):
+        return [(tag, round(score, 12)) for tag, score in results]
+
+    assert rounded(hashed.classify_batch(texts)) == rounded(tfidf.classify_batch(texts))
+    assert cached.classify_batch(texts) == hashed.classify_batch(texts)
+    assert not hasattr(hashed.vectorizer, "vocabulary_")
+
+    data = json.loads(INTENTS_PATH.read_text())
+    data["intents"][0]["patterns"].append("brand new zorblax greeting")
+    incremental = hashed._index.updated(data)
+    full = HashedIntentIndex.build(data)
+    assert (incremental.tfidf_t != full.tfidf_t).nnz == 0
+    assert incremental.best_candidates(["zorblax"])[0][0] == full.pattern_texts.index(
+        "brand new zorblax greeting"
+    )
+
+
+def test_incomplete_backend_fails_when_constructed():
+    class NoScoring(RetrievalIndex):
+        @classmethod
+        def build(cls, data):
+            return cls([], [], {})
+
+    with pytest.raises(TypeError):
+        NoScoring.build({"intents": []})
@@ -0,0 +1,49 @@
+from chatbot.cache import LRUCache, normalize_text
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "a" is now most recently used
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    info = cache.info()
+    assert info["hits"] == 3
+    assert info["misses"] == 1
+    assert info["size"] == 2
+
+
+def test_lru_cache_resize_and_disable():
+    cache = LRUCache(maxsize=3)
+    for key in "abc":
+        cache.put(key, key)
+    cache.resize(1)
+    assert len(cache) == 1
+    assert cache.get("c") == "c"
+
+    cache.resize(0)
+    cache.put("d", "d")
+    assert cache.get("d") is None
+
+
+def test_normalize_text_collapses_whitespace():
+    assert normalize_text("  ok \t bye\n") == "ok bye"
+
+
+def test_lru_cache_expires_entries_after_ttl():
+    now = [0.0]
+    cache = LRUCache(maxsize=4, ttl=10, clock=lambda: now[0])
+    cache.put("a", 1)
+    now[0] = 9.9
+    assert cache.get("a") == 1
+
+    now[0] = 10.0
+    assert cache.get("a") is None
+    info = cache.info()
+    assert info["expired"] == 1
+    assert info["size"] == 0
+    assert info["hit_rate"] == 0.5
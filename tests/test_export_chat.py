@@ -0,0 +1,31 @@
+import csv
+import io
+import json
+
+from chatbot.export_chat import export_chat, iter_export
+
+HISTORY = [
+    {"User_text": "hello", "Bot_reply": "Hi!", "label": "Neutral", "score": 0.0},
+    {"User_text": "great, thanks", "Bot_reply": "Anytime!", "label": "Positive", "score": 0.7906},
+]
+
+
+def test_export_chat_writes_text_transcript(tmp_path):
+    path = tmp_path / "chat.txt"
+    export_chat(HISTORY, filename=path)
+
+    assert path.read_text(encoding="utf-8") == (
+        "=== Chat Transcript ===\n\n"
+        "User: hello\nSentiment: Neutral (compound=0.0)\nBot: Hi!\n" + "-" * 40 + "\n"
+        "User: great, thanks\nSentiment: Positive (compound=0.7906)\nBot: Anytime!\n"
+        + "-" * 40 + "\n"
+    )
+
+
+def test_iter_export_streams_jsonl_and_csv_from_an_iterator():
+    jsonl = list(iter_export(iter(HISTORY), "jsonl"))
+    assert [json.loads(line)["User_text"] for line in jsonl] == ["hello", "great, thanks"]
+
+    rows = list(csv.DictReader(io.StringIO("".join(iter_export(iter(HISTORY), "csv")))))
+    assert rows[1]["User_text"] == "great, thanks"
+    assert float(rows[1]["score"]) == 0.7906
@@ -0,0 +1,105 @@
+import json
+
+import numpy as np
+
+from chatbot.history import (
+    ConversationHistory,
+    ConversationLog,
+    migrate_legacy_history,
+    save_history,
+)
+
+HISTORY = [
+    {"User_text": "hello", "Bot_reply": "Hi!", "label": "Neutral", "score": 0.0},
+    {"User_text": "ok bye", "Bot_reply": "Bye!", "label": "Positive", "score": 0.296},
+]
+
+
+def test_save_history_appends_instead_of_overwriting(tmp_path):
+    path = tmp_path / "history.jsonl"
+    first = save_history(HISTORY, path)
+    second = save_history(HISTORY[:1], path, overall="Neutral")
+
+    log = ConversationLog(path)
+    assert (first, second) == (0, 1)
+    assert len(log) == 2
+    assert log.read_conversation(0)["turns"] == HISTORY
+    assert log.read_conversation(1)["overall"] == "Neutral"
+    assert [c["id"] for c in log.iter_conversations()] == [0, 1]
+
+
+def test_log_recovers_from_torn_write_and_lost_index(tmp_path):
+    path = tmp_path / "history.jsonl"
+    log = ConversationLog(path, fsync="never")
+    log.append_conversation(HISTORY)
+    log.append_conversation(HISTORY)
+
+    # crash mid-write: half a line on disk, index never updated
+    with open(path, "ab") as f:
+        f.write(b'{"id": 2, "turns": [')
+    (tmp_path / "history.jsonl.idx").write_bytes(b"")
+
+    recovered = ConversationLog(path)
+    assert len(recovered) == 2
+    assert recovered.read_conversation(1)["turns"] == HISTORY
+    assert recovered.append_conversation(HISTORY) == 2
+    assert len(list(ConversationLog(path).iter_conversations())) == 3
+
+
+def test_log_reopens_from_the_last_index_entry(tmp_path):
+    path = tmp_path / "history.jsonl"
+    index_path = tmp_path / "history.jsonl.idx"
+    for _ in range(3):
+        save_history(HISTORY, path)
+    whole = index_path.read_bytes()
+
+    reopened = ConversationLog(path)
+    assert len(reopened) == 3
+    assert reopened.read_conversation(2)["turns"] == HISTORY
+    assert index_path.read_bytes() == whole
+
+    # a torn last entry and a missing one are both rebuilt from the data file
+    index_path.write_bytes(whole[:-24])
+    assert len(ConversationLog(path)) == 3
+    assert index_path.read_bytes() == whole
+
+
+def test_migrate_legacy_history(tmp_path):
+    legacy = tmp_path / "history.json"
+    legacy.write_text(json.dumps(HISTORY, indent=4))
+    path = tmp_path / "history.jsonl"
+
+    conversation_id = migrate_legacy_history(legacy, path)
+
+    assert ConversationLog(path).read_conversation(conversation_id)["turns"] == HISTORY
+
+
+def test_conversation_history_round_trips_turns(tmp_path):
+    extra = {"User_text": "très bien", "Bot_reply": "", "label": "Positive", "score": 0.4404,
+             "tag": "greeting"}
+    history = ConversationHistory(HISTORY)
+    history.append(extra)
+    turns = HISTORY + [extra]
+
+    assert len(history) == 3
+    assert list(history) == turns
+    assert history[-1] == extra
+    assert history[1:] == turns[1:]
+    # existing callers take it wherever they took the list of dicts
+    log = ConversationLog(tmp_path / "history.jsonl")
+    assert log.read_conversation(log.append_conversation(history))["turns"] == turns
+
+
+def test_conversation_history_column_views_share_memory():
+    history = ConversationHistory(HISTORY * 50)
+
+    assert history.scores.dtype == np.float32
+    assert np.shares_memory(history.scores, history._scores)
+    assert history.label_codes.tolist() == [1, 2] * 50
+    assert history.nbytes() < 60 * len(history)
+
+    frame = history.to_frame()
+    assert np.shares_memory(frame["score"].to_numpy(), history._scores)
+    assert np.shares_memory(frame["label"].array.codes, history._labels)
+    assert frame["label"].tolist() == ["Neutral", "Positive"] * 50
+    assert frame["tag"].isna().all()
@@ -0,0 +1,48 @@
+import pytest
+
+from chatbot.export_chat import export_chat
+from chatbot.import_chat import TranscriptParseError, import_transcripts, parse_transcript
+from chatbot.storage import ChatStore
+
+HISTORY = [
+    {"User_text": "hello", "Bot_reply": "Hi!", "label": "Neutral", "score": 0.0},
+    {"User_text": "that was\nreally great", "Bot_reply": "Anytime!", "label": "Positive", "score": 0.7906},
+    {"User_text": "this is awful", "Bot_reply": "Sorry about that.", "label": "Negative", "score": -0.4588},
+]
+
+
+def test_parse_transcript_round_trips_export(tmp_path):
+    path = tmp_path / "chat_export_20251205_200402.txt"
+    export_chat(HISTORY, filename=path)
+
+    assert list(parse_transcript(path)) == HISTORY
+
+
+def test_parse_transcript_reports_file_and_line(tmp_path):
+    path = tmp_path / "chat_export_20251205_200402.txt"
+    export_chat(HISTORY, filename=path)
+    lines = path.read_text(encoding="utf-8").splitlines(keepends=True)
+    lines[7] = "Sentiment: Happy (compound=0.5)\n"
+    path.write_text("".join(lines), encoding="utf-8")
+
+    with pytest.raises(TranscriptParseError) as excinfo:
+        list(parse_transcript(path))
+    assert excinfo.value.lineno == 8
+    assert str(path) in str(excinfo.value)
+
+
+def test_import_transcripts_loads_store_and_skips_bad_files(tmp_path):
+    export_chat(HISTORY, filename=tmp_path / "chat_export_20251205_200402.txt")
+    export_chat(HISTORY[:1], filename=tmp_path / "chat_export_20251205_202248.txt")
+    (tmp_path / "chat_export_20251205_221637.txt").write_text("not a transcript\n")
+    (tmp_path / "chat_export_20251205_230000.txt").mkdir()
+    store = ChatStore(tmp_path / "chats.db")
+
+    imported, errors = import_transcripts(tmp_path, store, workers=2)
+
+    assert imported == 2
+    assert len(errors) == 2 and "chat_export_20251205_221637.txt:1:" in errors[0]
+    assert errors[1] == f"{tmp_path / 'chat_export_20251205_230000.txt'}: Is a directory"
+    first = store.list_conversations()[0]
+    assert first["created_at"] == "2025-12-05T20:04:02"
+    assert store.get_turns(first["id"]) == HISTORY
@@ -0,0 +1,48 @@
+import pytest
+
+from chatbot import metrics
+from chatbot.bot_logic import SimpleRetrievalBot
+from chatbot.sentiment import clear_sentiment_cache, get_sentiment_label_and_score
+
+
+@pytest.fixture
+def recording():
+    metrics.reset()
+    metrics.enable()
+    yield
+    metrics.disable()
+    metrics.reset()
+
+
+def test_disabled_timers_record_nothing():
+    metrics.reset()
+    metrics.disable()
+    with metrics.timer("stage"):
+        pass
+    metrics.timed("fn")(lambda: None)()
+    assert metrics.snapshot() == {}
+
+
+def test_bot_and_sentiment_stages_are_recorded(recording):
+    bot = SimpleRetrievalBot("intents.json", use_index_cache=False, cache_size=0)
+    bot.reply("hello")
+    clear_sentiment_cache()
+    get_sentiment_label_and_score("I love this")
+
+    stats = metrics.snapshot()
+    for stage in ("bot.reply", "bot.transform", "bot.similarity",
+                  "bot.select_response", "sentiment.score"):
+        assert stats[stage]["count"] == 1
+        assert 0.0 < stats[stage]["p50"] <= stats[stage]["max"]
+
+
+def test_prometheus_text_has_cumulative_buckets(recording):
+    for seconds in (0.0002, 0.003, 0.003, 20.0):
+        metrics.observe("export", seconds)
+
+    text = metrics.prometheus_text()
+    assert '# TYPE chatbot_stage_seconds histogram' in text
+    assert 'chatbot_stage_seconds_bucket{stage="export",le="0.00025"} 1' in text
+    assert 'chatbot_stage_seconds_bucket{stage="export",le="0.005"} 3' in text
+    assert 'chatbot_stage_seconds_bucket{stage="export",le="+Inf"} 4' in text
+    assert 'chatbot_stage_seconds_count{stage="export"} 4' in text
@@ -0,0 +1,50 @@
+import io
+import json
+from pathlib import Path
+
+from chatbot.bot_logic import SimpleRetrievalBot
+from chatbot.replay import read_messages, run_replay
+
+INTENTS_PATH = Path("intents.json")
+
+
+def test_read_messages_supports_lines_and_jsonl():
+    assert list(read_messages(io.StringIO("hi\n\nbye\n"))) == ["hi", "bye"]
+    jsonl = io.StringIO('{"text": "hi"}\n{"text": "bye", "id": 2}\n')
+    assert list(read_messages(jsonl, fmt="jsonl")) == ["hi", "bye"]
+
+
+def test_run_replay_writes_one_record_per_message_in_order():
+    bot = SimpleRetrievalBot(INTENTS_PATH, use_index_cache=False)
+    messages = ["hello", "this is terrible", "thanks a lot!"] * 5
+    output = io.StringIO()
+
+    count = run_replay(bot, io.StringIO("\n".join(messages)), output, batch_size=4, report=None)
+
+    records = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert count == len(messages)
+    assert [r["text"] for r in records] == messages
+    assert records[0]["tag"] == "greeting"
+    assert records[1]["label"] == "Negative"
+    assert all(0.0 <= r["confidence"] <= 1.0 for r in records)
+    # the top rank_batch entry is the classify_batch match
+    matches = bot.classify_batch(messages)
+    assert [(r["tag"], r["score"]) for r in records] == [
+        (tag, round(score, 6)) for tag, score in matches
+    ]
+
+
+def test_run_replay_skips_and_reports_bad_jsonl_lines():
+    bot = SimpleRetrievalBot(INTENTS_PATH, use_index_cache=False)
+    log = '{"text": "hello"}\n{"msg": "x"}\nnot json\n[1, 2]\n{"text": "bye"}\n'
+    output, report = io.StringIO(), io.StringIO()
+
+    count = run_replay(bot, io.StringIO(log), output, fmt="jsonl", report=report)
+
+    assert count == 2
+    assert [json.loads(line)["text"] for line in output.getvalue().splitlines()] == ["hello", "bye"]
+    lines = report.getvalue().splitlines()
+    assert [line.split(":")[0] for line in lines[:3]] == [
+        "Skipping line 2", "Skipping line 3", "Skipping line 4",
+    ]
+    assert "skipped 3 lines" in lines[-1]
@@ -1,7 +1,11 @@
 from chatbot.sentiment import (
+    clear_sentiment_cache,
     get_sentiment_label_and_score,
+    score_many,
+    sentiment_cache_info,
     summarize_conversation,
     analyze_trend,
+    RunningSummary,
 )
 
 
@@ -42,3 +46,66 @@ def test_analyze_trend_improves():
     trend = analyze_trend(scores)
     # Just check it mentions "improved" or "positive"
     assert "improved" in trend or "positive" in trend.lower()
+
+
+def test_sentiment_cache_counts_hits_for_repeated_messages():
+    clear_sentiment_cache()
+    first = get_sentiment_label_and_score("thanks, that was great")
+    second = get_sentiment_label_and_score("  thanks,  that was great ")
+
+    assert first == second
+    info = sentiment_cache_info()
+    assert info["hits"] == 1
+    assert info["misses"] == 1
+
+
+def test_score_many_preserves_order_across_workers():
+    texts = ["I love it", "I hate it", "it is a table"] * 1000
+
+    serial = list(score_many(texts))
+    pooled = list(score_many(iter(texts), workers=2, chunksize=250))
+
+    assert pooled == serial
+    assert serial[:3] == [get_sentiment_label_and_score(t) for t in texts[:3]]
+
+
+def test_running_summary_matches_batch_functions_every_turn():
+    scores = [0.0, 0.6, -0.4, -0.7, 0.05, 0.0, 0.3, -0.05, 0.8]
+    summary = RunningSummary()
+
+    for i, score in enumerate(scores, start=1):
+        summary.add(score)
+        history = [{"score": s} for s in scores[:i]]
+        assert summary.overall() == summarize_conversation(history)
+        assert summary.trend() == analyze_trend(scores[:i])
+
+
+def test_summaries_agree_next_to_the_threshold():
+    # weighted scores within one rounding error of -0.05; a compensated
+    # sum() (Python 3.12+) and plain addition land on opposite sides
+    cases = {(0.42, 0.34, -0.6): "Negative", (0.27, -0.32, -0.05): "Neutral"}
+
+    for scores, label in cases.items():
+        assert summarize_conversation([{"score": s} for s in scores]) == label
+        assert RunningSummary(scores).overall() == label
+
+
+def test_overall_label_drops_the_explanation():
+    assert RunningSummary().overall_label() == "Neutral"
+    assert RunningSummary([0.0, 0.0]).overall_label() == RunningSummary([0.0]).overall()[0]
+    assert RunningSummary([0.6, 0.4]).overall_label() == RunningSummary([0.6, 0.4]).overall()
+
+
+def test_one_lazily_built_analyzer_per_process():
+    import subprocess
+    import sys
+
+    from chatbot import sentiment
+
+    assert sentiment.sia is sentiment.get_analyzer()
+    # importing the modules must not load sklearn or the VADER lexicon
+    code = (
+        "import sys, chatbot.bot_logic, chatbot.sentiment; "
+        "assert 'sklearn' not in sys.modules and 'vaderSentiment' not in sys.modules"
+    )
+    assert subprocess.run([sys.executable, "-c", code]).returncode == 0
@@ -0,0 +1,97 @@
+import asyncio
+import json
+from pathlib import Path
+
+from chatbot.bot_logic import SimpleRetrievalBot
+from chatbot.server import MicroBatcher, serve
+
+INTENTS_PATH = Path("intents.json")
+
+
+async def _post(port, path, payload, content_length=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = json.dumps(payload).encode()
+    if content_length is None:
+        content_length = len(body)
+    writer.write(
+        f"POST {path} HTTP/1.1\r\nContent-Length: {content_length}\r\nConnection: close\r\n\r\n".encode()
+        + body
+    )
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(body)
+
+
+def test_micro_batcher_coalesces_concurrent_requests():
+    calls = []
+
+    def process(items):
+        calls.append(list(items))
+        return [item * 2 for item in items]
+
+    async def run():
+        batcher = MicroBatcher(process, max_batch=64, max_delay=0.05)
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(10)))
+        batcher.close()
+        return results
+
+    assert asyncio.run(run()) == [i * 2 for i in range(10)]
+    assert calls == [list(range(10))]
+
+
+def test_server_endpoints_match_direct_calls():
+    bot = SimpleRetrievalBot(INTENTS_PATH, use_index_cache=False)
+    texts = ["hello", "this is terrible", "thanks a lot!"]
+
+    async def run():
+        chat_server, server = await serve(bot, port=0, max_delay=0.02)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            replies = await asyncio.gather(*(_post(port, "/reply", {"text": t}) for t in texts))
+            sentiment = await _post(port, "/sentiment", {"text": "I love this"})
+            summary = await _post(port, "/summarize", {"scores": [-0.6, 0.1, 0.7]})
+            missing = await _post(port, "/nope", {})
+            bad = await _post(port, "/reply", {"txt": "hi"})
+        chat_server.close()
+        return replies, sentiment, summary, missing, bad, chat_server.reply_batcher.batches
+
+    replies, sentiment, summary, missing, bad, batches = asyncio.run(run())
+
+    expected = bot.answer_batch(texts)
+    assert [status for status, _ in replies] == [200] * 3
+    assert [r["tag"] for _, r in replies] == [tag for _, tag, _ in expected]
+    assert replies[1][1]["label"] == "Negative"
+    assert batches == 1
+    assert sentiment == (200, {"label": "Positive", "compound": sentiment[1]["compound"]})
+    assert summary[0] == 200 and set(summary[1]) == {"overall", "trend"}
+    assert missing[0] == 404
+    assert bad[0] == 400
+
+
+class _BrokenBot:
+    def answer_batch(self, texts):
+        raise RuntimeError("boom")
+
+
+def test_server_rejects_bad_payloads_and_reports_internal_errors():
+    async def run():
+        chat_server, server = await serve(_BrokenBot(), port=0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            results = [
+                await _post(port, "/summarize", {"scores": "abc"}),
+                await _post(port, "/summarize", {"scores": [None]}),
+                await _post(port, "/summarize", {"history": [1, 2]}),
+                await _post(port, "/summarize", {"history": [{"score": "high"}]}),
+                await _post(port, "/reply", {"text": "hi"}, content_length="abc"),
+                await _post(port, "/reply", {"text": "hi"}),
+            ]
+        chat_server.close()
+        return results
+
+    results = asyncio.run(run())
+
+    assert [status for status, _ in results] == [400, 400, 400, 400, 400, 500]
+    assert all("error" in body for _, body in results)
@@ -0,0 +1,32 @@
+from chatbot.storage import ChatStore
+
+HISTORY = [
+    {"User_text": "hello", "Bot_reply": "Hi!", "label": "Neutral", "score": 0.0, "tag": "greeting"},
+    {"User_text": "ok bye", "Bot_reply": "Bye!", "label": "Positive", "score": 0.296},
+]
+
+
+def test_save_and_read_back_conversation(tmp_path):
+    store = ChatStore(tmp_path / "chats.db")
+    conversation_id = store.save_conversation(
+        HISTORY, overall="Positive", trend="Tone shifted from neutral to positive.",
+        session_id="s1",
+    )
+
+    conversation = store.get_conversation(conversation_id)
+    assert conversation["overall"] == "Positive"
+    assert conversation["n_turns"] == 2
+    assert conversation["history"] == HISTORY
+
+
+def test_list_conversations_pages_per_session(tmp_path):
+    store = ChatStore(tmp_path / "chats.db")
+    for i in range(5):
+        store.save_conversation(HISTORY[:1], overall=f"chat {i}", session_id="s1")
+    store.save_conversation(HISTORY, session_id="s2")
+
+    assert store.count_conversations(session_id="s1") == 5
+    assert store.count_conversations() == 6
+    page = store.list_conversations(limit=2, offset=2, session_id="s1")
+    assert [c["overall"] for c in page] == ["chat 2", "chat 3"]
+    assert store._connect().execute("PRAGMA journal_mode").fetchone()[0] == "wal"
@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+from chatbot.bot_logic import SimpleRetrievalBot
+from chatbot.tenants import TenantRegistry
+
+
+def _catalog(path, topic):
+    data = {
+        "intents": [
+            {"tag": f"{topic}_greet", "patterns": ["hello there", "hi"], "responses": [f"hi from {topic}"]},
+            {"tag": f"{topic}_price", "patterns": [f"how much is the {topic}", "price please"],
+             "responses": [f"the {topic} costs 5"]},
+            {"tag": f"{topic}_bye", "patterns": ["goodbye", "see you later"], "responses": ["bye"]},
+        ]
+    }
+    path.write_text(json.dumps(data))
+    return path
+
+
+def test_registry_matches_one_hashed_bot_per_tenant(tmp_path):
+    paths = {topic: _catalog(tmp_path / f"{topic}.json", topic) for topic in ("pizza", "bike")}
+    registry = TenantRegistry(paths, min_confidence=0.0)
+    queries = ["hello", "how much is the pizza", "price of a bike please", "see you", "qwerty"]
+
+    for tenant, path in paths.items():
+        bot = SimpleRetrievalBot(path, backend="hashed", use_index_cache=False, cache_size=0)
+        for q, (tag, score) in zip(queries, bot.classify_batch(queries)):
+            got_tag, got_score = registry.classify(tenant, q)
+            assert got_tag == tag
+            assert got_score == pytest.approx(score)
+
+    assert registry.reply("bike", "how much is the bike") == "the bike costs 5"
+    strict = TenantRegistry(paths, min_confidence=0.5)
+    assert strict.answer("pizza", "qwerty")[1] is None
+
+
+def test_registry_loads_lazily_and_evicts_least_recently_used(tmp_path):
+    for topic in ("pizza", "bike", "boat"):
+        _catalog(tmp_path / f"{topic}.json", topic)
+    registry = TenantRegistry()
+    registry.register_directory(tmp_path)
+    assert registry.loaded_tenants() == []
+
+    registry.reply("pizza", "hi")
+    one_tenant = registry.memory_usage()
+    registry.memory_budget = int(one_tenant * 2.5)
+
+    registry.reply("bike", "hi")
+    registry.reply("pizza", "hi")   # pizza is now the most recently used
+    registry.reply("boat", "hi")    # over budget: bike goes
+
+    assert registry.loaded_tenants() == ["pizza", "boat"]
+    assert registry.stats()["evictions"] == 1
+    # an evicted tenant is simply read again, and the others keep their rows
+    assert registry.reply("bike", "how much is the bike") == "the bike costs 5"
+    assert registry.reply("boat", "how much is the boat") == "the boat costs 5"
+
+    with pytest.raises(KeyError):
+        registry.reply("plane", "hi")